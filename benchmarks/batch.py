@@ -0,0 +1,40 @@
+"""
+Measure the throughput of running type.scriic over many phrases as the
+number of worker processes grows.
+
+Usage: python benchmarks/batch.py [ROWS]
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from scriic.batch import run_batch
+
+TYPE = Path(__file__).parent.parent / "scriicsics" / "type.scriic"
+
+
+def measure(rows, workers):
+    """Return the number of rows processed per second."""
+    parameter_sets = (
+        {"text": f"the quick brown fox number {i}", "keyboard": "the keyboard"}
+        for i in range(rows)
+    )
+
+    start = time.perf_counter()
+    for result in run_batch(TYPE, parameter_sets, workers):
+        pass
+    return rows / (time.perf_counter() - start)
+
+
+def main(rows):
+    cpus = os.cpu_count()
+    print(f"{cpus} CPUs")
+    print(f"{'workers':>8} {'rows/s':>10}")
+    for workers in sorted({1, 2, 4, cpus}):
+        print(f"{workers:>8} {measure(rows, workers):>10.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
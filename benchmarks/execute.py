@@ -0,0 +1,37 @@
+"""
+Time running type.scriic from the bundled Scriicsics with long inputs.
+
+Usage: python benchmarks/execute.py [LENGTH ...]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from scriic.run import FileRunner
+
+TYPE = Path(__file__).parent.parent / "scriicsics" / "type.scriic"
+
+
+def measure(length, repeats=3):
+    """Return the best time taken to run type.scriic on a string."""
+    text = ("the quick brown fox jumps over the lazy dog " * length)[:length]
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        FileRunner(TYPE).run({"text": text, "keyboard": "the keyboard"})
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(lengths):
+    print(f"{'letters':>8} {'seconds':>10} {'letters/s':>10}")
+    for length in lengths:
+        elapsed = measure(length)
+        print(f"{length:>8} {elapsed:>10.4f} {length / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10, 100, 1000, 10000])
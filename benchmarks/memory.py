@@ -0,0 +1,39 @@
+"""
+Measure the memory used by the instruction tree of type.scriic.
+
+Usage: python benchmarks/memory.py [LENGTH ...]
+"""
+
+import sys
+import tracemalloc
+from pathlib import Path
+
+from scriic.run import FileRunner
+
+TYPE = Path(__file__).parent.parent / "scriicsics" / "type.scriic"
+
+
+def measure(length):
+    """Return the number of instructions and bytes allocated for them."""
+    text = ("the quick brown fox jumps over the lazy dog " * length)[:length]
+    runner = FileRunner(TYPE)
+
+    tracemalloc.start()
+    instruction = runner.run({"text": text, "keyboard": "the keyboard"})
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return sum(1 for _ in instruction.pre_order()), size
+
+
+def main(lengths):
+    print(f"{'letters':>8} {'instructions':>13} {'bytes':>12} {'bytes/instr':>12}")
+    for length in lengths:
+        instructions, size = measure(length)
+        print(
+            f"{length:>8} {instructions:>13} {size:>12} {size / instructions:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
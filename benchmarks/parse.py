@@ -0,0 +1,53 @@
+"""
+Compare the throughput of the line parser and the combinator grammar.
+
+Usage: python benchmarks/parse.py [LINES ...]
+"""
+
+import sys
+import time
+
+from scriic.parser import parse
+
+BODY = """\
+key = DO Find the key on [keyboard] which displays [char"]
+SUB ./press_button.scriic
+PRM button = [key]
+GO
+"""
+
+
+def generate(lines):
+    """Generate a program of roughly the given number of lines."""
+    parts = ["HOWTO Type <text\"> on <keyboard>\n"]
+    total = 1
+    while total < lines:
+        parts.append("char = LETTERS [text]\n  REPEAT 2\n")
+        parts.append(BODY)
+        parts.append("  END\nEND\n")
+        total += 8
+    return "".join(parts)
+
+
+def measure(text, combinators):
+    start = time.perf_counter()
+    parse(text, combinators=combinators)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    print(f"{'lines':>8} {'combinators':>14} {'line parser':>14} {'speedup':>8}")
+    for lines in sizes:
+        text = generate(lines)
+        assert parse(text) == parse(text, combinators=True)
+
+        slow = measure(text, True)
+        fast = measure(text, False)
+        print(
+            f"{lines:>8} {lines / slow:>10.0f} l/s {lines / fast:>10.0f} l/s "
+            f"{slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000, 50000])
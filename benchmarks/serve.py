@@ -0,0 +1,117 @@
+"""
+Load test ``scriic serve`` on localhost.
+
+Starts a server for the bundled Scriicsics, sends requests to run type.scriic
+from several concurrent keep-alive connections, and prints the throughput,
+client-side latency and the server's metrics.
+
+Usage: python benchmarks/serve.py [REQUESTS] [CONNECTIONS]
+"""
+
+import asyncio
+import json
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SCRIICSICS = Path(__file__).parent.parent / "scriicsics"
+HOST = "127.0.0.1"
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+async def request(reader, writer, method, target, body=b""):
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nHost: {HOST}\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+        + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def wait_for_server(port):
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection(HOST, port)
+        except OSError:
+            await asyncio.sleep(0.1)
+        else:
+            writer.close()
+            return
+    raise RuntimeError("Server did not start")
+
+
+async def client(port, count, latencies):
+    reader, writer = await asyncio.open_connection(HOST, port)
+    for i in range(count):
+        body = json.dumps(
+            {
+                "script": "type.scriic",
+                "parameters": {"text": f"phrase {i}", "keyboard": "the keyboard"},
+            }
+        ).encode("utf-8")
+
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, "POST", "/run", body)
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert status == 200
+    writer.close()
+
+
+async def load_test(port, requests, connections):
+    await wait_for_server(port)
+
+    latencies = list()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(client(port, requests // connections, latencies) for _ in range(connections))
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print(f"{len(latencies)} requests over {connections} connections")
+    print(f"{len(latencies) / elapsed:.0f} requests/s")
+    for p in (0.5, 0.9, 0.99):
+        print(f"p{int(p * 100)}: {latencies[int(len(latencies) * p)]:.2f}ms")
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    _, metrics = await request(reader, writer, "GET", "/metrics")
+    writer.close()
+    print("Server metrics:", json.dumps(metrics, indent=2))
+
+
+def main(requests, connections):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "scriic", "serve", "--root", str(SCRIICSICS)]
+        + ["--port", str(port)]
+    )
+    try:
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(load_test(port, requests, connections))
+        loop.close()
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*(args + [1000, 8][len(args) :]))
@@ -0,0 +1,51 @@
+"""
+Time a script which does little but substitute variables into text.
+
+Usage: python benchmarks/substitute.py [LETTERS ...]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from scriic.run import FileRunner
+
+SCRIPT = """\
+HOWTO Spell <word"> for <person>
+char = LETTERS [word]
+  upper = DO Find the capital form of [char"]
+  DO Tell [person] that [char"] is written as [upper] in [word"]
+  DO Write [char] and [upper] next to [word]
+  DO Say [char"] to [person] loudly
+END
+"""
+
+
+def measure(runner, length, repeats=3):
+    """Return the best time taken to run the script on a word."""
+    word = ("abcdefghijklmnopqrstuvwxyz" * length)[:length]
+
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        runner.run({"word": word, "person": "the reader"})
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(lengths):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "spell.scriic"
+        path.write_text(SCRIPT)
+        runner = FileRunner(path)
+
+        print(f"{'letters':>8} {'seconds':>10} {'steps/s':>10}")
+        for length in lengths:
+            elapsed = measure(runner, length)
+            print(f"{length:>8} {elapsed:>10.4f} {4 * length / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000])
@@ -1,15 +1,29 @@
+import sys
+from itertools import islice
+
 import fire
 
 from .run import FileRunner
 
 
-def run(file):
+def _numbered(instructions):
+    for i, instruction in enumerate(instructions):
+        instruction.display_index = i + 1
+        yield instruction
+
+
+def run(file, stream=False, head=None, from_=None, to=None):
     """
     Run a Scriic and print the generated instructions.
 
     Any parameters will be asked for on the command line.
 
     :param file: Path to the file to run
+    :param stream: Print each instruction as soon as it is generated, rather
+        than building the full tree first
+    :param head: Stop running after this many instructions, implies ``stream``
+    :param from_: Number of the first instruction to print, given as ``--from``
+    :param to: Number of the last instruction to print
     """
     runner = FileRunner(file)
 
@@ -18,18 +32,155 @@ def run(file):
     for param in runner.required_parameters:
         params[param] = input(f"Parameter {param}: ")
 
+    # Range of instructions to print, counting from 0
+    start = 0 if from_ is None else max(from_ - 1, 0)
+    stop = to
+    if head is not None:
+        stop = start + head if stop is None else min(stop, start + head)
+
     # Run the scriic
-    instruction = runner.run(params)
+    if stream or head is not None:
+        instructions = runner.iter_steps(params)
+        if start > 0 or stop is not None:
+            instructions = islice(instructions, start, stop)
+    elif start > 0 or stop is not None:
+        # Only generate the instructions which are printed
+        instruction = runner.run(params, lazy=True)
+        instruction.number()
+        instructions = instruction.leaves(start, stop)
+    else:
+        instructions = _numbered(runner.run(params).leaf_nodes())
 
     # Print instructions
-    for i, instruction in enumerate(instruction.leaf_nodes()):
-        instruction.display_index = i + 1
+    for instruction in instructions:
         print(f"{instruction.display_index}. {instruction.text()}")
 
 
+def compile_(path):
+    """
+    Save compiled versions of Scriic files so they load faster in future.
+
+    :param path: A file, or a directory to search for ``.scriic`` files
+    """
+    from .bytecode import compile_all
+
+    failed = False
+    for file_path, error in compile_all(path):
+        if error is None:
+            print(f"Compiled {file_path}")
+        else:
+            print(f"Failed to compile {file_path}: {error}", file=sys.stderr)
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+def batch(file, params, output=None, directory=None, workers=None, chunksize=16):
+    """
+    Run a Scriic once for each set of parameters in a JSON Lines file.
+
+    Results are written as JSON Lines in the same order as the parameters, each
+    with either a list of ``steps`` or an ``error``.
+
+    :param file: Path to the file to run
+    :param params: File with a JSON object of parameters on each line, or ``-``
+        to read standard input
+    :param output: File to write results to, instead of standard output
+    :param directory: Instead of JSON Lines, write the instructions for each set
+        of parameters to a text file in this directory, named by line number
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    :param chunksize: Number of parameter sets sent to a worker at once
+    """
+    import json
+    import os
+
+    from .batch import read_parameter_sets, run_batch
+
+    params_file = sys.stdin if params == "-" else open(params, encoding="utf-8")
+    with params_file:
+        results = run_batch(file, read_parameter_sets(params_file), workers, chunksize)
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            failed = False
+            for i, result in enumerate(results):
+                if "error" in result:
+                    print(f"Line {i + 1}: {result['error']}", file=sys.stderr)
+                    failed = True
+                    continue
+
+                file_path = os.path.join(directory, f"{i + 1}.txt")
+                with open(file_path, "w", encoding="utf-8") as out:
+                    for j, text in enumerate(result["steps"]):
+                        out.write(f"{j + 1}. {text}\n")
+
+            if failed:
+                sys.exit(1)
+            return
+
+        out = sys.stdout if output is None else open(output, "w", encoding="utf-8")
+        with out:
+            for result in results:
+                out.write(json.dumps(result) + "\n")
+
+
+def serve(root=".", host="127.0.0.1", port=8000, workers=None):
+    """
+    Serve the Scriic files in a directory over HTTP.
+
+    Send a POST request to ``/run`` with a JSON object such as
+    ``{"script": "type.scriic", "parameters": {"text": "Hi"}}`` to run a file,
+    and GET ``/metrics`` for request latency and cache statistics.
+
+    :param root: Directory containing the files to serve
+    :param host: Address to listen on
+    :param port: Port to listen on
+    :param workers: Number of worker processes, defaults to the number of CPUs
+    """
+    import asyncio
+    import signal
+
+    from .serve import Server
+
+    server = Server(root, workers)
+    loop = asyncio.new_event_loop()
+    try:
+        # Stop cleanly when terminated, so that the workers are shut down too
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    except NotImplementedError:
+        pass
+
+    try:
+        loop.run_until_complete(server.start(host, port))
+        print(f"Serving {server.root} on http://{host}:{port}", file=sys.stderr)
+        loop.run_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        loop.close()
+
+
+# Subcommands which can be given before the arguments, e.g. ``scriic compile``
+COMMANDS = {"compile": compile_, "batch": batch, "serve": serve}
+
+
+def _keyword_flags(args):
+    """Rename flags which are Python keywords to their parameter names."""
+    for arg in args:
+        if arg == "--from" or arg.startswith("--from="):
+            arg = "--from_" + arg[len("--from") :]
+        yield arg
+
+
 # This is used as an entrypoint in setup.py
 def main():
-    fire.Fire(run)
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        name = sys.argv[1]
+        fire.Fire(COMMANDS[name], command=sys.argv[2:], name=f"scriic {name}")
+    else:
+        fire.Fire(run, command=list(_keyword_flags(sys.argv[1:])), name="scriic")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Running one Scriic file with many sets of parameters.
+
+The file is parsed once by each worker process, and each set of parameters
+is then run by whichever worker is free. Results are returned in the same
+order as the parameter sets.
+"""
+
+import json
+import multiprocessing
+
+from scriic.errors import ScriicRuntimeException
+from scriic.run import FileRunner
+
+# Runner for the file, created once in each worker process
+_runner = None
+
+
+def _init_worker(file_path):
+    global _runner
+    _runner = FileRunner(file_path)
+
+
+def _run_one(parameters):
+    """
+    Run the file with one set of parameters.
+
+    :returns: Dictionary with either a list of ``steps``, or an ``error``.
+    """
+    try:
+        instruction = _runner.run(dict(parameters))
+    except ScriicRuntimeException as e:
+        return {"error": str(e)}
+
+    steps = list()
+    for i, leaf in enumerate(instruction.leaf_nodes()):
+        leaf.display_index = i + 1
+        steps.append(leaf.text())
+    return {"steps": steps}
+
+
+def run_batch(file_path, parameter_sets, workers=None, chunksize=16):
+    """
+    Run a file once for each set of parameters.
+
+    Parameter sets are read from the iterable as workers become free, and
+    results are yielded as soon as they and every result before them are
+    ready.
+
+    :param file_path: Path to the file to run.
+    :param parameter_sets: Iterable of dictionaries of parameters.
+    :param workers: Number of worker processes, defaulting to the number of
+        CPUs. With 1, everything is run in this process.
+    :param chunksize: Number of parameter sets sent to a worker at once.
+    :returns: Iterator of results, as dictionaries with either a list of
+        ``steps`` texts, or an ``error`` message.
+    :raises ScriicSyntaxException: The file could not be parsed.
+    """
+    # Report syntax errors before starting any workers, and fill the compiled
+    # cache so that workers do not all parse the file
+    _init_worker(file_path)
+
+    if workers == 1:
+        yield from map(_run_one, parameter_sets)
+        return
+
+    with multiprocessing.Pool(
+        workers, initializer=_init_worker, initargs=(file_path,)
+    ) as pool:
+        yield from pool.imap(_run_one, parameter_sets, chunksize)
+
+
+def read_parameter_sets(lines):
+    """
+    Yield sets of parameters from lines of JSON objects, skipping blank lines.
+
+    Values which are not strings are converted to strings.
+    """
+    for line in lines:
+        if line.strip():
+            yield {name: str(value) for name, value in json.loads(line).items()}
@@ -0,0 +1,207 @@
+import hashlib
+import marshal
+import os
+import struct
+import sys
+
+from scriic import nodes
+from scriic.errors import ScriicSyntaxException
+
+MAGIC = b"SCRC"
+CACHE_DIR = "__scriiccache__"
+
+# Magic, parser version, marshal version, SHA-256 of the source
+_HEADER = struct.Struct("<4sHB32s")
+
+# Nodes are stored as tuples which begin with their index in this list
+NODE_TYPES = [
+    nodes.Parameter,
+    nodes.Substitution,
+    nodes.Do,
+    nodes.Import,
+    nodes.SubParameter,
+    nodes.Sub,
+    nodes.Return,
+    nodes.Repeat,
+    nodes.Letters,
+]
+_NODE_CODES = {node_type: code for code, node_type in enumerate(NODE_TYPES)}
+
+
+def source_hash(text):
+    """Return the digest which identifies a version of some source code."""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest()
+
+
+def cache_path(source_path):
+    """
+    Return the path where the compiled version of a file is stored.
+
+    Like ``__pycache__``, this is a directory next to the source file.
+    """
+    directory, name = os.path.split(os.fspath(source_path))
+    return os.path.join(directory, CACHE_DIR, name + "c")
+
+
+def _encode(obj):
+    code = _NODE_CODES.get(type(obj))
+    if code is not None:
+        return (code,) + tuple(_encode(field) for field in obj)
+    elif type(obj) == list:
+        return [_encode(item) for item in obj]
+    return obj
+
+
+def _decode(obj):
+    if type(obj) == tuple:
+        return NODE_TYPES[obj[0]](*[_decode(field) for field in obj[1:]])
+    elif type(obj) == list:
+        return [_decode(item) for item in obj]
+    return obj
+
+
+def dumps(program, digest):
+    """
+    Serialize a parsed program.
+
+    :param program: ``(title, steps)`` tuple as returned by the parser.
+    :param digest: Result of :func:`source_hash` for the program's source.
+    """
+    header = _HEADER.pack(MAGIC, nodes.PARSER_VERSION, marshal.version, digest)
+    return header + marshal.dumps(_encode(list(program)))
+
+
+def loads(data, digest):
+    """
+    Deserialize a program created by :func:`dumps`.
+
+    :param digest: Result of :func:`source_hash` for the current source.
+    :returns: ``(title, steps)``, or ``None`` if the data was made from a
+        different source or by an incompatible version of Scriic.
+    """
+    try:
+        magic, version, marshal_version, data_digest = _HEADER.unpack_from(data)
+    except struct.error:
+        return None
+
+    if (
+        magic != MAGIC
+        or version != nodes.PARSER_VERSION
+        or marshal_version != marshal.version
+        or data_digest != digest
+    ):
+        return None
+
+    try:
+        title, steps = _decode(marshal.loads(data[_HEADER.size :]))
+    except (EOFError, ValueError, TypeError, IndexError):
+        # The file is corrupt
+        return None
+    return title, steps
+
+
+def read_cache(source_path, digest):
+    """Load a program from the cache, or return ``None`` if it is unavailable."""
+    try:
+        with open(cache_path(source_path), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+    return loads(data, digest)
+
+
+def write_cache(source_path, digest, program):
+    """
+    Store a program in the cache.
+
+    Failures are ignored, since the directory may not be writable.
+
+    :returns: Whether the program was written.
+    """
+    path = cache_path(source_path)
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temporary_path, "wb") as file:
+            file.write(dumps(program, digest))
+        os.replace(temporary_path, path)
+    except OSError:
+        return False
+    return True
+
+
+def _parse(text, file_path):
+    # The parser is imported here so that cached programs load without it
+    from parsy import ParseError
+    from scriic.parser import parse
+
+    try:
+        return parse(text)
+    except ParseError as e:
+        raise ScriicSyntaxException(file_path, str(e)) from e
+
+
+def load_program(file_path):
+    """
+    Read a file and return its parsed ``(title, steps)``.
+
+    A compiled version is used if one exists for the current source, otherwise
+    the file is parsed and the result is saved, unless
+    ``sys.dont_write_bytecode`` is set.
+
+    :raises ScriicSyntaxException: The file contains a syntax error.
+    """
+    with open(file_path) as file:
+        text = file.read()
+
+    digest = source_hash(text)
+    program = read_cache(file_path, digest)
+    if program is None:
+        program = _parse(text, file_path)
+        if not sys.dont_write_bytecode:
+            write_cache(file_path, digest, program)
+    return program
+
+
+def compile_file(file_path):
+    """
+    Parse a file and save it to the cache, regardless of any existing version.
+
+    :returns: Whether the compiled program could be written.
+    :raises ScriicSyntaxException: The file contains a syntax error.
+    """
+    with open(file_path) as file:
+        text = file.read()
+
+    program = _parse(text, file_path)
+    return write_cache(file_path, source_hash(text), program)
+
+
+def _try_compile(path):
+    try:
+        if not compile_file(path):
+            raise OSError(f"Could not write {cache_path(path)}")
+    except (OSError, ScriicSyntaxException) as e:
+        return path, e
+    return path, None
+
+
+def compile_all(path):
+    """
+    Compile a file, or every ``.scriic`` file inside a directory tree.
+
+    :returns: Generator of ``(path, error)`` tuples, where ``error`` is ``None``
+        or the exception raised while compiling that file.
+    """
+    if not os.path.isdir(path):
+        yield _try_compile(path)
+        return
+
+    for root, directories, files in os.walk(path):
+        if CACHE_DIR in directories:
+            directories.remove(CACHE_DIR)
+        directories.sort()
+
+        for name in sorted(files):
+            if name.endswith(".scriic"):
+                yield _try_compile(os.path.join(root, name))
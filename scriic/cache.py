@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import OrderedDict
+
+from scriic.bytecode import load_program
+from scriic.program import Program
+
+
+class ProgramCache:
+    """
+    Thread-safe cache of parsed Scriic programs.
+
+    Programs are keyed by the resolved path of their file, and an entry is
+    discarded as soon as the file's modification time or size changes. When the
+    cache is full, the least recently used program is evicted.
+
+    Programs which are not in memory are loaded through
+    :func:`scriic.bytecode.load_program`, so they may come from the compiled
+    cache on disk.
+
+    :param maxsize: Maximum number of programs to keep in memory.
+    :var hits: Number of loads which were answered from the cache.
+    :var misses: Number of loads which had to read and parse the file.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, file_path):
+        """
+        Return the :class:`scriic.program.Program` in a file, parsing it if
+        necessary.
+
+        The returned program is shared between all users of the cache, so it
+        must not be modified.
+
+        :param file_path: Path to the file to load.
+        :raises ScriicSyntaxException: The file contains a syntax error.
+        :raises FileNotFoundError: The file does not exist.
+        """
+        path = os.path.realpath(file_path)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # Parse outside of the lock so other files can be loaded meanwhile
+        program = Program(*load_program(file_path))
+
+        with self._lock:
+            self._entries[path] = (stamp, program)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return program
+
+    def clear(self):
+        """Remove all programs from the cache and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Shared by every FileRunner in this process
+program_cache = ProgramCache()
@@ -1,6 +1,12 @@
+from bisect import bisect_right
+
 from .errors import UnsetDisplayIndexException
 from .value import Value
 
+# Incremented whenever any display index changes, which invalidates text
+# cached by Instruction.freeze
+_numbering = 0
+
 
 class Instruction:
     """
@@ -16,40 +22,115 @@ class Instruction:
         back to this instruction.
     """
 
+    __slots__ = (
+        "text_value",
+        "_children",
+        "_display_index",
+        "_first_leaf",
+        "_frozen",
+        "_leaf_index",
+    )
+
     def __init__(self, text):
         if type(text) != Value:
             text = Value(text)
 
         self.text_value = text
-        self.children = list()
+        # Most instructions are leaves, so they share an empty tuple until
+        # they are given a child
+        self._children = ()
 
         # This is set to the instruction number when it is displayed
-        self.display_index = None
+        self._display_index = None
+
+        # Deepest known node on the chain of first children
+        self._first_leaf = None
+
+        # (numbering, text) stored by freeze
+        self._frozen = None
+
+        # Running totals of the leaves of each child, built by leaf_count
+        self._leaf_index = None
+
+    @property
+    def display_index(self):
+        return self._display_index
+
+    @display_index.setter
+    def display_index(self, display_index):
+        global _numbering
+        _numbering += 1
+        self._display_index = display_index
+
+    @property
+    def children(self):
+        if type(self._children) != list:
+            self._children = list(self._children)
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        self._first_leaf = None
+        self._leaf_index = None
+
+    def first_leaf(self):
+        """
+        Return the first leaf which is a descendant of this instruction.
+
+        The result is cached. Children may be appended afterwards, but
+        inserting a new first child with ``children.insert`` is not noticed.
+        """
+        node = self._first_leaf or self
+        while node._children:
+            node = node._children[0]
+        self._first_leaf = node
+        return node
 
     def get_display_index(self):
         """
         Get the display index for this instruction.
 
-        If this instruction does not have a display index itself, attempt to return
-        the display index of its first child. This can recurse and have the
-        effect of selecting the display index of the first leaf node.
+        If this instruction does not have a display index itself, return the
+        display index of its first leaf node.
 
         :raises UnsetDisplayIndexException: No display index could be found.
         """
-        if self.display_index is not None:
-            return self.display_index
-        elif len(self.children) > 0:
-            return self.children[0].get_display_index()
-        else:
+        if self._display_index is not None:
+            return self._display_index
+
+        display_index = self.first_leaf()._display_index
+        if display_index is None:
             raise UnsetDisplayIndexException("Display index not set")
+        return display_index
 
     def __repr__(self):
         return f"instruction {self.get_display_index()}"
 
     def text(self):
         """Return the static text of this instruction."""
+        frozen = self._frozen
+        if frozen is not None and frozen[0] == _numbering:
+            return frozen[1]
         return str(self.text_value)
 
+    def freeze(self):
+        """
+        Render the text of this instruction and its descendants once.
+
+        Call this after every display index has been set. Later calls to
+        :meth:`text` return the cached text until any display index changes.
+        Children added after freezing are not frozen.
+        """
+        for instruction in self.pre_order():
+            try:
+                text = str(instruction.text_value)
+            except UnsetDisplayIndexException:
+                # Refers to an instruction which has not been numbered
+                instruction._frozen = None
+            else:
+                instruction._frozen = (_numbering, text)
+
     def add_child(self, *args, **kwargs):
         """
         Create a new Instruction and add it as a child of this one.
@@ -57,16 +138,286 @@ class Instruction:
         :returns: Created instruction
         """
         child = Instruction(*args, **kwargs)
-        self.children.append(child)
+        self.append_child(child)
         return child
 
+    def append_child(self, child):
+        """Add an existing Instruction as a child of this one."""
+        if self._children:
+            self._children.append(child)
+        else:
+            self._children = [child]
+        self._leaf_index = None
+
+    def is_leaf(self):
+        """Return whether this instruction has no children."""
+        return not self._children
+
+    def pre_order(self):
+        """Yield this instruction and its descendants, parents first."""
+        yield self
+
+        # Use an explicit stack so that deep trees do not hit the recursion
+        # limit
+        stack = [iter(self._children)]
+        while stack:
+            for child in stack[-1]:
+                yield child
+                if child._children:
+                    stack.append(iter(child._children))
+                    break
+            else:
+                stack.pop()
+
+    def post_order(self):
+        """Yield the descendants of this instruction and then itself."""
+        stack = [(self, iter(self._children))]
+        while stack:
+            for child in stack[-1][1]:
+                if child._children:
+                    stack.append((child, iter(child._children)))
+                    break
+                yield child
+            else:
+                yield stack.pop()[0]
+
+    def leaf_count(self):
+        """
+        Return the number of leaves which are descendants of this instruction.
+
+        The iterations of a :class:`RepeatedInstruction` are counted without
+        generating them. The number of leaves under each descendant is stored,
+        so this should only be called once the tree is complete: adding
+        children to a descendant afterwards is not noticed.
+        """
+        if not self._children:
+            return 1
+        if self._leaf_index is None:
+            self._build_leaf_index()
+        return self._leaf_index[-1]
+
+    def _build_leaf_index(self):
+        stack = [self]
+        while stack:
+            node = stack[-1]
+            pending = [
+                child
+                for child in node._children
+                if child._children
+                and child._leaf_index is None
+                and not isinstance(child, RepeatedInstruction)
+            ]
+            if pending:
+                stack.extend(pending)
+                continue
+
+            stack.pop()
+            total = 0
+            index = list()
+            for child in node._children:
+                total += child.leaf_count()
+                index.append(total)
+            node._leaf_index = index
+
+    def _child_containing(self, n):
+        """
+        Find the child which contains leaf ``n`` of this instruction.
+
+        :returns: The index of the child, and the index of the leaf within it.
+        """
+        self.leaf_count()
+        index = self._leaf_index
+        i = bisect_right(index, n)
+        if i > 0:
+            n -= index[i - 1]
+        return i, n
+
+    def leaf_at(self, n):
+        """
+        Return the leaf at index ``n`` of :meth:`leaf_nodes`, counting from 0.
+
+        This takes time proportional to the depth of the tree, and only
+        generates the iteration of a :class:`RepeatedInstruction` which
+        contains the leaf.
+
+        :raises IndexError: There are not that many leaves.
+        """
+        count = self.leaf_count()
+        if n < 0:
+            n += count
+        if not 0 <= n < count:
+            raise IndexError("leaf index out of range")
+
+        node = self
+        while node._children:
+            i, n = node._child_containing(n)
+            node = node._children[i]
+        return node
+
+    def leaves(self, start=0, stop=None):
+        """
+        Yield the leaves from index ``start`` up to but not including ``stop``,
+        as if slicing :meth:`leaf_nodes`.
+
+        The first leaf is found as with :meth:`leaf_at`, so nothing before it
+        is visited or generated.
+        """
+        count = self.leaf_count()
+        if stop is None or stop > count:
+            stop = count
+        remaining = stop - start
+        if start < 0 or remaining <= 0:
+            return
+
+        # Find the first leaf, keeping the following siblings at each level
+        stack = list()
+        node = self
+        n = start
+        while node._children:
+            i, n = node._child_containing(n)
+            stack.append(_following(node._children, i))
+            node = node._children[i]
+
+        yield node
+        remaining -= 1
+
+        while stack and remaining:
+            for child in stack[-1]:
+                if child._children:
+                    stack.append(iter(child._children))
+                    break
+                yield child
+                remaining -= 1
+                if not remaining:
+                    return
+            else:
+                stack.pop()
+
+    def number(self, start=1):
+        """
+        Set the display index of each leaf to its position, counting from
+        ``start``.
+
+        Iterations of a :class:`RepeatedInstruction` which have not been
+        generated yet are numbered when they are generated.
+
+        :returns: The display index after the last leaf.
+        """
+        index = start
+        stack = [iter((self,))]
+        while stack:
+            for node in stack[-1]:
+                if type(node._children) == _Iterations:
+                    node._children.number(index, node.leaves_per_iteration)
+                    index += node.leaf_count()
+                elif node._children:
+                    stack.append(iter(node._children))
+                    break
+                else:
+                    node.display_index = index
+                    index += 1
+            else:
+                stack.pop()
+        return index
+
     def leaf_nodes(self):
         """Yield the leaves which are descendants of this instruction."""
-        if len(self.children) > 0:
-            for child in self.children:
-                # Recursively call leaf_nodes on each child
-                for leaf in child.leaf_nodes():
-                    yield leaf
-        else:
+        if not self._children:
             # We are a leaf node
             yield self
+            return
+
+        stack = [iter(self._children)]
+        while stack:
+            for child in stack[-1]:
+                if child._children:
+                    stack.append(iter(child._children))
+                    break
+                yield child
+            else:
+                stack.pop()
+
+
+def _following(children, i):
+    """Yield the children after index ``i``."""
+    for j in range(i + 1, len(children)):
+        yield children[j]
+
+
+class _Iterations:
+    """
+    Sequence of the iterations of a :class:`RepeatedInstruction`, which are
+    generated the first time they are accessed.
+    """
+
+    __slots__ = ("count", "generate", "generated", "start", "step")
+
+    def __init__(self, count, generate, first):
+        self.count = count
+        self.generate = generate
+        self.generated = {0: first}
+
+        # Set by number
+        self.start = None
+        self.step = None
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("iteration index out of range")
+
+        try:
+            return self.generated[i]
+        except KeyError:
+            iteration = self.generated[i] = self.generate(i)
+            if self.start is not None:
+                iteration.number(self.start + i * self.step)
+            return iteration
+
+    def number(self, start, step):
+        """
+        Number the leaves of each iteration, where each has ``step`` leaves
+        and the first starts from ``start``.
+        """
+        self.start = start
+        self.step = step
+        for i, iteration in self.generated.items():
+            iteration.number(start + i * step)
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+
+class RepeatedInstruction(Instruction):
+    """
+    An instruction whose children are the iterations of a loop.
+
+    Each child is an instruction with empty text, whose children are the
+    instructions generated by one iteration. Every iteration generates the same
+    number of leaves, so they can be counted without generating them, and each
+    iteration is only generated when it is first accessed.
+
+    :param count: Number of iterations.
+    :param generate: Function which is given the index of an iteration and
+        returns its instruction.
+    :param first: Instruction of the first iteration, which has already been
+        generated.
+    """
+
+    __slots__ = ("leaves_per_iteration",)
+
+    def __init__(self, count, generate, first):
+        super().__init__(Value())
+        self._children = _Iterations(count, generate, first)
+        self.leaves_per_iteration = first.leaf_count()
+
+    def leaf_count(self):
+        return len(self._children) * self.leaves_per_iteration
+
+    def _child_containing(self, n):
+        return divmod(n, self.leaves_per_iteration)
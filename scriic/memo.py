@@ -0,0 +1,178 @@
+"""
+Reuse of the output of subscriics.
+
+A subscriic which is given completely known parameters always generates the
+same instructions, so its output can be recorded as a :class:`SubTemplate`
+the first time, and copied at every later call with the same parameters.
+"""
+
+from scriic.instruction import Instruction, RepeatedInstruction
+from scriic.value import UnknownValue, Value
+
+# Subscriics which generate more instructions than this are not recorded, so
+# that streaming runs never hold a large subtree in memory
+MAX_INSTRUCTIONS = 10000
+
+
+def memo_key(path, parameters):
+    """
+    Return a hashable key for a call to a subscriic.
+
+    :param path: Resolved path of the subscriic.
+    :param parameters: Dictionary of parameter names and Values.
+    :returns: The key, or ``None`` if a parameter is not completely known.
+    """
+    items = list()
+    for name, value in parameters.items():
+        for part in value:
+            if type(part) != str:
+                return None
+        items.append((name, tuple(value)))
+
+    items.sort()
+    return path, tuple(items)
+
+
+class _Unrecordable(Exception):
+    pass
+
+
+def _references(value, index):
+    """
+    Find the parts of a Value which refer to recorded instructions.
+
+    :returns: List of ``(position, kind, node)`` tuples, or ``None`` if there
+        are no references.
+    :raises _Unrecordable: A part refers to an instruction which has not been
+        recorded.
+    """
+    references = None
+
+    for position, part in enumerate(value):
+        if type(part) == UnknownValue:
+            kind = UnknownValue
+            target = part.instruction
+        elif isinstance(part, Instruction):
+            kind = Instruction
+            target = part
+        else:
+            continue
+
+        try:
+            node = index[id(target)]
+        except KeyError:
+            raise _Unrecordable
+
+        if references is None:
+            references = list()
+        references.append((position, kind, node))
+
+    return references
+
+
+def _remap(value, references, clones):
+    parts = list(value)
+    for position, kind, node in references:
+        if kind == UnknownValue:
+            parts[position] = UnknownValue(clones[node])
+        else:
+            parts[position] = clones[node]
+    return Value.from_parts(parts)
+
+
+class SubTemplate:
+    """
+    Recorded output of a subscriic.
+
+    :param nodes: List of ``(text, parent, references, is_leaf)`` tuples for
+        each instruction, in pre-order.
+    :param return_value: Value returned by the subscriic, or ``None``.
+    :param return_references: References in the return value, as for nodes.
+    """
+
+    __slots__ = ("nodes", "return_value", "return_references")
+
+    def __init__(self, nodes, return_value, return_references):
+        self.nodes = nodes
+        self.return_value = return_value
+        self.return_references = return_references
+
+    def __len__(self):
+        return len(self.nodes)
+
+    @classmethod
+    def record(cls, root, return_value):
+        """
+        Record the output of a subscriic.
+
+        :param root: Instruction returned by the subscriic, with all of its
+            children retained.
+        :param return_value: Return value of the subscriic.
+        :returns: The template, or ``None`` if the output cannot be recorded
+            because it is too large, contains a
+            :class:`scriic.instruction.RepeatedInstruction`, or it refers to
+            outside instructions.
+        """
+        nodes = list()
+        index = dict()
+        stack = [(root, -1)]
+
+        try:
+            while stack:
+                instruction, parent = stack.pop()
+                if len(nodes) >= MAX_INSTRUCTIONS:
+                    return None
+                if isinstance(instruction, RepeatedInstruction):
+                    # Copying it would generate every iteration
+                    return None
+
+                references = _references(instruction.text_value, index)
+                index[id(instruction)] = len(nodes)
+                nodes.append(
+                    (
+                        instruction.text_value,
+                        parent,
+                        references,
+                        instruction.is_leaf(),
+                    )
+                )
+
+                position = len(nodes) - 1
+                for child in reversed(instruction._children):
+                    stack.append((child, position))
+
+            if return_value is not None:
+                return_references = _references(return_value, index)
+            else:
+                return_references = None
+        except _Unrecordable:
+            return None
+
+        return cls(nodes, return_value, return_references)
+
+    def instantiate(self):
+        """
+        Create a new copy of the recorded output.
+
+        :returns: Tuple of the root instruction, a list of its leaves in order,
+            and the return value.
+        """
+        clones = list()
+        leaves = list()
+
+        for text, parent, references, is_leaf in self.nodes:
+            if references is not None:
+                text = _remap(text, references, clones)
+
+            clone = Instruction(text)
+            clones.append(clone)
+            if parent >= 0:
+                clones[parent].append_child(clone)
+            if is_leaf:
+                leaves.append(clone)
+
+        return_value = self.return_value
+        if self.return_references is not None:
+            return_value = _remap(return_value, self.return_references, clones)
+
+        return clones[0], leaves, return_value
@@ -0,0 +1,27 @@
+"""
+Nodes of the syntax tree produced by :mod:`scriic.parser`.
+
+These are kept separate from the grammar so that programs can be loaded from a
+compiled cache without importing the parser.
+"""
+
+from collections import namedtuple
+
+# HOWTO
+Parameter = namedtuple("Parameter", "name quoted")
+
+# Text
+Substitution = namedtuple("Substitution", "name quoted")
+
+# Steps
+Do = namedtuple("Do", "text assign_to")
+Import = namedtuple("Import", "module path")
+SubParameter = namedtuple("SubParameter", "name value")
+Sub = namedtuple("Sub", "file parameters assign_to")
+Return = namedtuple("Return", "value")
+Repeat = namedtuple("Repeat", "times steps")
+Letters = namedtuple("Letters", "text assign_to steps")
+
+# Increase this whenever the parser starts producing a different tree for the
+# same source, so that compiled caches made by older versions are ignored
+PARSER_VERSION = 1
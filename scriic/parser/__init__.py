@@ -3,6 +3,7 @@ from parsy import *
 from scriic.parser.do import do
 from scriic.parser.howto import howto
 from scriic.parser.letters import letters
+from scriic.parser.lines import parse_lines
 from scriic.parser.primitives import newline
 from scriic.parser.repeat import repeat
 from scriic.parser.return_ import return_
@@ -21,11 +22,18 @@ def program():
     return title, steps
 
 
-def parse(text):
+def parse(text, combinators=False):
     """
     Parse some text as a Scriic program and return an AST.
 
+    By default, the hand-written parser in :mod:`scriic.parser.lines` is used,
+    which is much faster than the combinator grammar defined in this package.
+    Both give the same results.
+
     :param text: Program to parse.
+    :param combinators: Use the combinator grammar instead.
     :raises ParseError: There is a syntax error in the program.
     """
-    return program.parse(text)
+    if combinators:
+        return program.parse(text)
+    return parse_lines(text)
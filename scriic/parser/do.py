@@ -1,9 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Do
 from scriic.parser.primitives import assignment, text
 
-Do = namedtuple("Do", "text assign_to")
-
 
 @generate("DO")
 def do():
@@ -1,9 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Parameter
 from scriic.parser.primitives import variable
 
-Parameter = namedtuple("Parameter", "name quoted")
-
 
 @generate("parameter")
 def parameter():
@@ -1,9 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Letters
 from scriic.parser.primitives import assignment, block, text
 
-Letters = namedtuple("Letters", "text assign_to steps")
-
 
 @generate("LETTERS")
 def letters():
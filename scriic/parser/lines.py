@@ -0,0 +1,241 @@
+"""
+A hand-written, line-oriented parser for Scriic programs.
+
+It accepts exactly the same language as the combinator grammar in
+:mod:`scriic.parser`, and builds the same tree, but never backtracks over more
+than the parameter lines of a single ``SUB``. Blocks are tracked with an
+explicit stack, so deeply nested programs do not recurse.
+
+When a program contains a syntax error, it is parsed again with the combinator
+grammar, so that the :class:`parsy.ParseError` raised is identical.
+"""
+
+import re
+
+from scriic.nodes import (
+    Do,
+    Import,
+    Letters,
+    Parameter,
+    Repeat,
+    Return,
+    Sub,
+    SubParameter,
+    Substitution,
+)
+
+# These must stay equivalent to the regexes in primitives.py
+_VARIABLE = re.compile(r"[a-zA-Z_]\w*")
+_ASSIGNMENT = re.compile(r"([a-zA-Z_]\w*) = ")
+_NUMBER = re.compile(r"\d+")
+_PATH = re.compile(r"\S+")
+_TEXT_PART = re.compile(r'\[([a-zA-Z_]\w*)(")?\]|[^\[\n]+')
+_TITLE_PART = re.compile(r'<([a-zA-Z_]\w*)(")?>|[^<\n]+')
+
+
+class _Invalid(Exception):
+    """The program is not valid, for a reason the combinator grammar will give."""
+
+
+def _parts(string, pattern, node_type):
+    """Split a whole line into literal strings and substitutions."""
+    if not string:
+        raise _Invalid
+
+    parts = []
+    index = 0
+    while index < len(string):
+        match = pattern.match(string, index)
+        if match is None:
+            raise _Invalid
+
+        name = match.group(1)
+        if name is None:
+            parts.append(match.group())
+        else:
+            parts.append(node_type(name, match.group(2) is not None))
+        index = match.end()
+    return parts
+
+
+def _text(string):
+    if "[" not in string:
+        # Fast path for a single literal
+        if not string:
+            raise _Invalid
+        return [string]
+    return _parts(string, _TEXT_PART, Substitution)
+
+
+def _is_blank(string):
+    return not string or string.isspace()
+
+
+def _import_path(string):
+    """
+    Parse the rest of a ``SUB`` line.
+
+    The module prefix is not allowed to backtrack, to match ``import_path``.
+    """
+    module = None
+    index = 0
+
+    match = _VARIABLE.match(string)
+    if match is not None and string[match.end() : match.end() + 1] == ":":
+        module = match.group()
+        index = match.end() + 1
+
+    match = _PATH.match(string, index)
+    if match is None or not _is_blank(string[match.end() :]):
+        raise _Invalid
+    return Import(module, match.group())
+
+
+class _LineParser:
+    def __init__(self, text):
+        self.lines = text.split("\n")
+        self.index = 0
+
+    def next_line(self):
+        """
+        Return the next line which is not blank, without leading whitespace.
+
+        :returns: The line, or ``None`` at the end of the program.
+        """
+        lines = self.lines
+        index = self.index
+        while index < len(lines):
+            line = lines[index]
+            index += 1
+            if not _is_blank(line):
+                self.index = index
+                return line.lstrip()
+        self.index = index
+        return None
+
+    def parse(self):
+        line = self.next_line()
+        if line is None or not line.startswith("HOWTO "):
+            raise _Invalid
+        title = _parts(line[6:], _TITLE_PART, Parameter)
+
+        steps = list()
+        # Each open block is stored as (constructor, arguments, parent steps)
+        blocks = list()
+
+        while True:
+            line = self.next_line()
+
+            if line is None:
+                if blocks:
+                    # Missing END
+                    raise _Invalid
+                return title, steps
+
+            if blocks and line.rstrip() == "END":
+                if not steps:
+                    raise _Invalid
+                node_type, arguments, parent = blocks.pop()
+                parent.append(node_type(*arguments, steps))
+                steps = parent
+                continue
+
+            match = _ASSIGNMENT.match(line)
+            if match is not None:
+                assign_to = match.group(1)
+                rest = line[match.end() :]
+            else:
+                assign_to = None
+                rest = line
+
+            # The order here must be the same as the alternatives in ``step``,
+            # since a variable can be named RETURN or REPEAT
+            if rest.startswith("DO "):
+                steps.append(Do(_text(rest[3:]), assign_to))
+
+            elif rest.startswith("SUB "):
+                steps.append(self.sub(rest[4:], assign_to))
+
+            elif line.startswith("RETURN "):
+                steps.append(Return(_text(line[7:])))
+
+            elif assign_to is None and line.startswith("REPEAT "):
+                # "REPEAT = " can never be followed by a valid number of times
+                blocks.append((Repeat, (self.repeat_times(line[7:]),), steps))
+                steps = list()
+
+            elif rest.startswith("LETTERS "):
+                blocks.append((Letters, (_text(rest[8:]), assign_to), steps))
+                steps = list()
+
+            else:
+                raise _Invalid
+
+    def sub(self, string, assign_to):
+        path = _import_path(string)
+
+        # If the PRM lines are not valid up to GO, they are not part of this
+        # SUB, and whatever follows is parsed as a normal step
+        start = self.index
+        try:
+            parameters = self.sub_parameters()
+        except _Invalid:
+            self.index = start
+            parameters = list()
+
+        return Sub(path, parameters, assign_to)
+
+    def sub_parameters(self):
+        parameters = list()
+        while True:
+            line = self.next_line()
+            if line is None:
+                raise _Invalid
+
+            if line.startswith("PRM "):
+                match = _ASSIGNMENT.match(line, 4)
+                if match is None:
+                    raise _Invalid
+                value = _text(line[match.end() :])
+                parameters.append(SubParameter(match.group(1), value))
+
+            elif parameters and line.startswith("GO"):
+                if not _is_blank(line[2:]):
+                    # Text after GO is an error no matter how it is parsed
+                    raise _Invalid
+                return parameters
+
+            else:
+                raise _Invalid
+
+    def repeat_times(self, string):
+        match = _VARIABLE.match(string)
+        if match is not None:
+            times = match.group()
+        else:
+            match = _NUMBER.match(string)
+            if match is None:
+                raise _Invalid
+            times = int(match.group())
+
+        if not _is_blank(string[match.end() :]):
+            raise _Invalid
+        return times
+
+
+def parse_lines(text):
+    """
+    Parse some text as a Scriic program and return an AST.
+
+    :param text: Program to parse.
+    :raises ParseError: There is a syntax error in the program.
+    """
+    try:
+        return _LineParser(text).parse()
+    except _Invalid:
+        pass
+
+    # Let the combinator grammar describe the error
+    from scriic.parser import program
+
+    return program.parse(text)
@@ -1,5 +1,7 @@
 from parsy import *
 
+from scriic.nodes import Substitution
+
 # Also captures indentation and trailing spaces
 newline = regex(r"\s*\n\s*").desc("newline")
 
@@ -9,9 +11,6 @@ variable = regex(r"[a-zA-Z_]\w*").desc("variable name")
 assignment = variable << string(" = ").desc("variable assignment")
 
 
-Substitution = namedtuple("Substitution", "name quoted")
-
-
 @generate("substitution")
 def substitution():
     """A [variable_substitution] in some text."""
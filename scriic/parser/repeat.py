@@ -1,9 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Repeat
 from scriic.parser.primitives import block, number, variable
 
-Repeat = namedtuple("Repeat", "times steps")
-
 
 @generate("REPEAT")
 def repeat():
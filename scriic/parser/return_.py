@@ -1,9 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Return
 from scriic.parser.primitives import text
 
-Return = namedtuple("Return", "value")
-
 
 @generate("RETURN")
 def return_():
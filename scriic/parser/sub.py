@@ -1,11 +1,8 @@
 from parsy import *
 
+from scriic.nodes import Import, Sub, SubParameter
 from scriic.parser.primitives import assignment, newline, text, variable
 
-Import = namedtuple("Import", "module path")
-SubParameter = namedtuple("SubParameter", "name value")
-Sub = namedtuple("Sub", "file parameters assign_to")
-
 
 @generate("import path")
 def import_path():
@@ -0,0 +1,156 @@
+from collections import Counter
+
+from scriic.nodes import Do, Letters, Parameter, Repeat, Return, Sub
+
+
+def _names(parts):
+    return [part.name for part in parts if not isinstance(part, str)]
+
+
+def _reads(step):
+    """Return the variable names read by a step, not including its block."""
+    if isinstance(step, Do):
+        return _names(step.text)
+    elif isinstance(step, Sub):
+        return [name for p in step.parameters for name in _names(p.value)]
+    elif isinstance(step, Return):
+        return _names(step.value)
+    elif isinstance(step, Repeat):
+        return [step.times] if isinstance(step.times, str) else []
+    elif isinstance(step, Letters):
+        return _names(step.text)
+    return []
+
+
+def _walk(steps):
+    """Yield every step in a list of steps and their blocks, in order."""
+    stack = [iter(steps)]
+    while stack:
+        for step in stack[-1]:
+            yield step
+            if isinstance(step, (Repeat, Letters)):
+                stack.append(iter(step.steps))
+                break
+        else:
+            stack.pop()
+
+
+def _variable_names(title, steps):
+    """Return a list of every variable name used by a program, in order."""
+    names = dict.fromkeys(_names(title))
+
+    for step in _walk(steps):
+        for name in _reads(step):
+            names.setdefault(name)
+
+        assign_to = getattr(step, "assign_to", None)
+        if assign_to is not None:
+            names.setdefault(assign_to)
+
+    return list(names)
+
+
+def _assigned_before_read(steps, assigned, defined):
+    """
+    Check that a block only reads variables from ``assigned`` which it has
+    already set itself.
+
+    Variables set inside nested loops are not counted as set afterwards,
+    because the loop may not run.
+    """
+    defined = set(defined)
+    for step in steps:
+        if any(name in assigned and name not in defined for name in _reads(step)):
+            return False
+
+        if isinstance(step, (Repeat, Letters)):
+            block_defined = defined
+            if isinstance(step, Letters) and step.assign_to is not None:
+                block_defined = defined | {step.assign_to}
+            if not _assigned_before_read(step.steps, assigned, block_defined):
+                return False
+        elif getattr(step, "assign_to", None) is not None:
+            defined.add(step.assign_to)
+
+    return True
+
+
+class Program:
+    """
+    A parsed Scriic file.
+
+    One instance is shared between every runner of the same file through
+    :data:`scriic.cache.program_cache`, so it must not be modified.
+
+    :param title: Parts of the ``HOWTO`` line.
+    :param steps: List of steps in the program.
+    :var required_parameters: Frozen set of parameter names used by the title.
+    :var variables: Tuple of every variable name used by the program. While
+        running, the value of each variable is kept in the slot of a list at
+        the same index.
+    :var slots: Dictionary of variable names and their slot indexes.
+    :var plans: Execution plans compiled from the steps by
+        :class:`scriic.run.FileRunner`, keyed by the directory which relative
+        ``SUB`` paths are resolved from.
+    """
+
+    def __init__(self, title, steps):
+        self.title = title
+        self.steps = steps
+        self.required_parameters = frozenset(
+            x.name for x in title if isinstance(x, Parameter)
+        )
+        self.variables = tuple(_variable_names(title, steps))
+        self.slots = {name: i for i, name in enumerate(self.variables)}
+        self.plans = dict()
+        self._read_counts = None
+
+    def __iter__(self):
+        # Allow unpacking as (title, steps)
+        return iter((self.title, self.steps))
+
+    def is_self_contained(self, loop):
+        """
+        Return whether every iteration of a loop generates the same structure
+        of instructions, independently of the other iterations.
+
+        This is true when the loop does not ``RETURN``, the variables it sets
+        are only read inside it after being set in the same iteration, and a
+        ``LETTERS`` variable is only substituted into ``DO`` text. Such a loop
+        can be skipped over, or its iterations generated in any order.
+
+        :param loop: A :class:`scriic.nodes.Repeat` or
+            :class:`scriic.nodes.Letters` step from this program.
+        """
+        if self._read_counts is None:
+            counts = Counter(_names(self.title))
+            for step in _walk(self.steps):
+                counts.update(_reads(step))
+            self._read_counts = counts
+
+        body = list(_walk(loop.steps))
+        letter = loop.assign_to if isinstance(loop, Letters) else None
+
+        assigned = {step.assign_to for step in body if hasattr(step, "assign_to")}
+        assigned.discard(None)
+        if letter is not None:
+            assigned.add(letter)
+
+        reads = Counter()
+        for step in body:
+            if isinstance(step, Return):
+                return False
+
+            step_reads = _reads(step)
+            if letter in step_reads and not isinstance(step, Do):
+                # The letter could change how many instructions are generated
+                return False
+            reads.update(step_reads)
+
+        for name in assigned:
+            if reads[name] != self._read_counts[name]:
+                # Read outside of the loop
+                return False
+
+        defined = () if letter is None else (letter,)
+        return _assigned_before_read(loop.steps, assigned, defined)
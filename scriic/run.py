@@ -1,21 +1,60 @@
+import copy
 import os.path
-import re
+from collections import namedtuple
 
 import pkg_resources
-from parsy import ParseError
-
-from scriic.errors import ScriicRuntimeException, ScriicSyntaxException
-from scriic.instruction import Instruction
-from scriic.parser import parse
-from scriic.parser.do import Do
-from scriic.parser.howto import Parameter
-from scriic.parser.letters import Letters
-from scriic.parser.repeat import Repeat
-from scriic.parser.return_ import Return
-from scriic.parser.sub import Sub
-from scriic.substitute import substitute_variables
+
+from scriic.cache import program_cache
+from scriic.errors import ScriicRuntimeException
+from scriic.instruction import Instruction, RepeatedInstruction
+from scriic.memo import MAX_INSTRUCTIONS, SubTemplate, memo_key
+from scriic.nodes import Do, Letters, Repeat, Return, Sub
+from scriic.substitute import Template, quoted_parts, substitute_variables
 from scriic.value import UnknownValue, Value
 
+# Compiled steps. A plan is a list of (handler, op) pairs, and each step is run
+# by calling handler(runner, op), which returns an iterable of the leaf
+# instructions it has finished. Variables are referred to by their slot index
+# in Program.variables.
+DoOp = namedtuple("DoOp", "text assign_to")
+SubOp = namedtuple("SubOp", "file path parameters assign_to")
+ReturnOp = namedtuple("ReturnOp", "value")
+RepeatOp = namedtuple("RepeatOp", "times slot plan lazy")
+LettersOp = namedtuple("LettersOp", "text assign_to plan lazy")
+
+
+def resolve_import(import_, dir_path):
+    """
+    Return the path of the file referenced by a ``SUB``.
+
+    :param import_: Import path of the ``SUB``.
+    :param dir_path: Directory which relative paths are resolved from.
+    """
+    if import_.module is not None:
+        # Look for file inside a Python package
+        return pkg_resources.resource_filename(import_.module, import_.path)
+    else:
+        # Look for file relative to current scriic
+        return os.path.join(dir_path, import_.path)
+
+
+class _RunState:
+    """
+    State shared by every runner taking part in one run.
+
+    :var programs: Programs loaded by ``SUB``, keyed by path.
+    :var memo: Output of ``SUB`` calls with known parameters, keyed by
+        :func:`scriic.memo.memo_key`. Values are either a
+        :class:`scriic.memo.SubTemplate`, or the number of instructions
+        generated by a call which was not recorded.
+    """
+
+    __slots__ = ("programs", "memo")
+
+    def __init__(self):
+        self.programs = dict()
+        self.memo = dict()
+
 
 class FileRunner:
     """
@@ -25,36 +64,172 @@ class FileRunner:
     then be executed using :meth:`FileRunner.run`. Use the ``required_parameters``
     property to check what parameters must be passed when running.
 
+    Parsed programs are shared through :data:`scriic.cache.program_cache`, so
+    constructing many runners for the same unchanged file only parses it once.
+    The steps are also compiled once into a plan, where each step already knows
+    its handler, the path of any file it uses, and its prepared text.
+
     :param file_path: Path to the file to run.
     :var parameters: List of parametrs required by this Scriic.
     """
 
     def __init__(self, file_path):
+        self._load(file_path, program_cache.load(file_path), _RunState())
+
+    def _load(self, file_path, program, state):
+        """
+        Prepare to run a program.
+
+        :param state: :class:`_RunState` shared with subscriics.
+        """
         self.file_path = file_path
         self.dir_path = os.path.dirname(file_path)
 
-        with open(self.file_path) as file:
-            try:
-                self.title, self.steps = parse(file.read())
-            except ParseError as e:
-                raise ScriicSyntaxException(self.file_path, str(e)) from e
+        self.program = program
+        self.title = program.title
+        self.steps = program.steps
+        self.required_parameters = set(program.required_parameters)
+
+        try:
+            self.plan = program.plans[self.dir_path]
+        except KeyError:
+            self.plan = program.plans[self.dir_path] = self._compile(self.steps)
+
+        self._state = state
+        # Whether instructions keep all of their children. When this is false,
+        # only the first child is kept, which is enough to find the display
+        # index of any instruction.
+        self._retain = True
+        # Whether self-contained loops are added as a RepeatedInstruction
+        self._lazy = False
+
+    def _compile(self, steps):
+        """
+        Compile a list of steps into a plan.
 
-        self.required_parameters = {
-            x.name for x in self.title if isinstance(x, Parameter)
-        }
+        :raises ScriicRuntimeException: We do not know how to run a step.
+        """
+        plan = list()
+        slots = self.program.slots
+        # Slots of assigned variables, keeping None for no assignment
+        slot = slots.get
+
+        for step in steps:
+            if isinstance(step, Do):
+                op = DoOp(Template(step.text, slots), slot(step.assign_to))
+                plan.append((FileRunner._do, op))
+
+            elif isinstance(step, Sub):
+                try:
+                    path = resolve_import(step.file, self.dir_path)
+                except ImportError:
+                    # Raise the error if and when this SUB is reached
+                    path = None
+
+                parameters = [
+                    (parameter.name, Template(parameter.value, slots))
+                    for parameter in step.parameters
+                ]
+                op = SubOp(step.file, path, parameters, slot(step.assign_to))
+                plan.append((FileRunner._sub, op))
+
+            elif isinstance(step, Repeat):
+                op = RepeatOp(
+                    step.times,
+                    slot(step.times),
+                    self._compile(step.steps),
+                    self.program.is_self_contained(step),
+                )
+                plan.append((FileRunner._repeat, op))
+
+            elif isinstance(step, Letters):
+                op = LettersOp(
+                    Template(step.text, slots),
+                    slot(step.assign_to),
+                    self._compile(step.steps),
+                    self.program.is_self_contained(step),
+                )
+                plan.append((FileRunner._letters, op))
+
+            elif isinstance(step, Return):
+                plan.append((FileRunner._return, ReturnOp(Template(step.value, slots))))
 
-    def run(self, parameters=None):
+            else:
+                raise ScriicRuntimeException(
+                    self.file_path, f"Unrecognized step: {step}"
+                )
+
+        return plan
+
+    def run(self, parameters=None, lazy=False):
         """
         Run this file and return a tree of Instructions.
 
         :param parameters: Dictionary of parameters to pass to the script.
+        :param lazy: If true, a ``REPEAT`` or ``LETTERS`` loop whose iterations
+            do not depend on each other is not unrolled. Only its first
+            iteration is run, and it is added as a
+            :class:`scriic.instruction.RepeatedInstruction` which runs the
+            others when they are accessed.
         :returns: Tree of instructions. The root instruction's text will be the title.
         :raises ScriicRuntimeException: A problem was encountered during execution.
         """
-        self.variables = parameters or dict()
+        self._state = _RunState()
+        self._retain = True
+        self._lazy = lazy
+        self._start(parameters)
+        for leaf in self._steps():
+            pass
+        return self.instruction
+
+    def iter_steps(self, parameters=None):
+        """
+        Run this file, yielding each leaf instruction as soon as it is generated.
+
+        The instructions are numbered from 1 by setting their display index
+        before they are yielded. Execution only continues when the next
+        instruction is requested, so the generator can be closed early.
+
+        Completed instructions are not kept in a tree, so memory use does not
+        grow with the number of steps. Each instruction only keeps its first
+        child, and earlier instructions stay alive only while a variable or a
+        later instruction refers to them.
+
+        :param parameters: Dictionary of parameters to pass to the script.
+        :raises ScriicRuntimeException: A problem was encountered during execution.
+        """
+        self._state = _RunState()
+        self._retain = False
+        self._lazy = False
+        self._start(parameters)
+        return self._numbered_steps()
+
+    def _numbered_steps(self):
+        display_index = 0
+        for leaf in self._steps():
+            display_index += 1
+            leaf.display_index = display_index
+            yield leaf
+
+        if display_index == 0:
+            # The title is the only instruction
+            self.instruction.display_index = 1
+            yield self.instruction
+
+    def _start(self, parameters):
+        """Set up the variables and root instruction for a run."""
+        parameters = parameters or dict()
         self.return_value = None
 
-        given_parameters = set(self.variables.keys())
+        # Values of variables, and their parts when quoted, indexed by slot
+        self.frame = [None] * len(self.program.variables)
+        self.quoted = [None] * len(self.program.variables)
+        slots = self.program.slots
+        for name, value in parameters.items():
+            if name in slots:
+                self._set_variable(slots[name], value)
+
+        given_parameters = set(parameters.keys())
         missing_parameters = self.required_parameters.difference(given_parameters)
         if len(missing_parameters) > 0:
             raise ScriicRuntimeException(
@@ -62,97 +237,165 @@ class FileRunner:
                 "Missing one or more parameters: " + ", ".join(missing_parameters),
             )
 
-        title = substitute_variables(self.title, self.variables, self.file_path)
+        title = substitute_variables(self.title, parameters, self.file_path)
         self.instruction = Instruction(title)
-        for step in self.steps:
-            self._run_step(step)
-        return self.instruction
 
-    def _run_step(self, step):
-        """
-        :param step: Step to execute.
-        :raises ScriicRuntimeException: We do not know how to run this step.
-        """
-        if isinstance(step, Do):
-            self._do(step)
-        elif isinstance(step, Sub):
-            self._sub(step)
-        elif isinstance(step, Repeat):
-            self._repeat(step)
-        elif isinstance(step, Letters):
-            self._letters(step)
-        elif isinstance(step, Return):
-            self.return_value = substitute_variables(
-                step.value, self.variables, self.file_path
-            )
-        else:
-            raise ScriicRuntimeException(self.file_path, f"Unrecognized step: {step}")
+    def _steps(self):
+        """Run the plan, yielding leaf instructions as they are finished."""
+        return self._run_block(self.plan)
+
+    def _run_block(self, plan):
+        for handler, op in plan:
+            yield from handler(self, op)
 
-    def _set_variable(self, name, value):
+    def _add_child(self, text):
+        """Create a new Instruction and add it as a child of the current one."""
+        child = Instruction(text)
+        if self._retain or self.instruction.is_leaf():
+            self.instruction.append_child(child)
+        return child
+
+    def _set_variable(self, slot, value):
         """
         Set a variable value, casting to an instance of Value.
 
-        :param name: Name of the variable to set.
+        :param slot: Slot index of the variable to set.
         :param value: Value to set. May or may not already be a Value.
         """
         if type(value) != Value:
             value = Value(value)
 
-        self.variables[name] = value
+        self.frame[slot] = value
+        self.quoted[slot] = quoted_parts(value)
+
+    def _subrunner(self, path):
+        """Return a new runner for a file used by ``SUB``."""
+        programs = self._state.programs
+        try:
+            program = programs[path]
+        except KeyError:
+            program = programs[path] = program_cache.load(path)
+
+        runner = FileRunner.__new__(FileRunner)
+        runner._load(path, program, self._state)
+        runner._retain = self._retain
+        runner._lazy = self._lazy
+        return runner
 
     # COMMANDS BEGIN HERE #
-    def _do(self, step):
-        text = substitute_variables(step.text, self.variables, self.file_path)
-        child = self.instruction.add_child(text)
+    def _do(self, op):
+        text = op.text.substitute(self.frame, self.quoted, self.file_path)
+        child = self._add_child(text)
 
-        if step.assign_to is not None:
-            self._set_variable(step.assign_to, UnknownValue(child))
+        if op.assign_to is not None:
+            # Unknown values are never quoted
+            value = Value(UnknownValue(child))
+            self.frame[op.assign_to] = value
+            self.quoted[op.assign_to] = value
 
-    def _sub(self, step):
-        if step.file.module is not None:
-            # Look for file inside a Python package
-            path = pkg_resources.resource_filename(step.file.module, step.file.path)
-        else:
-            # Look for file relative to current scriic
-            path = os.path.join(self.dir_path, step.file.path)
+        return (child,)
+
+    def _sub(self, op):
+        path = op.path
+        if path is None:
+            path = resolve_import(op.file, self.dir_path)
 
         # Build dictionary of parameters
         parameters = {
-            parameter.name: substitute_variables(
-                parameter.value, self.variables, self.file_path
-            )
-            for parameter in step.parameters
+            name: template.substitute(self.frame, self.quoted, self.file_path)
+            for name, template in op.parameters
         }
-        # Run the subscriic and add its resulting instruction
-        runner = FileRunner(path)
-        self.instruction.children.append(runner.run(parameters))
+        # Reuse the output of an earlier call with the same parameters
+        key = memo_key(path, parameters)
+        entry = None
+        if key is not None:
+            entry = self._state.memo.get(key)
+            if type(entry) == SubTemplate:
+                return self._sub_memoized(op, path, entry)
+
+        # Run the subscriic, which must be started before this is iterated to
+        # report missing parameters
+        runner = self._subrunner(path)
+
+        if key is None:
+            runner._start(parameters)
+            return self._sub_steps(op, path, runner)
+        elif self._retain if entry is None else entry <= MAX_INSTRUCTIONS:
+            # Keep the whole output so that it can be recorded
+            runner._retain = True
+            runner._start(parameters)
+            return self._sub_recorded(op, path, runner, key)
+        elif entry is None:
+            # Find out whether the output is small enough to record next time
+            runner._start(parameters)
+            return self._sub_counted(op, path, runner, key)
+        else:
+            runner._start(parameters)
+            return self._sub_steps(op, path, runner)
+
+    def _sub_steps(self, op, path, runner):
+        yield from runner._steps()
+        yield from self._sub_result(op, path, runner.instruction, runner.return_value)
+
+    def _sub_recorded(self, op, path, runner, key):
+        yield from self._sub_steps(op, path, runner)
 
-        if step.assign_to is not None:
-            if runner.return_value is not None:
+        template = SubTemplate.record(runner.instruction, runner.return_value)
+        if template is None:
+            # Never try to record this call again
+            self._state.memo[key] = MAX_INSTRUCTIONS + 1
+        else:
+            self._state.memo[key] = template
+
+    def _sub_counted(self, op, path, runner, key):
+        count = 0
+        for leaf in runner._steps():
+            count += 1
+            yield leaf
+
+        self._state.memo[key] = count
+        yield from self._sub_result(op, path, runner.instruction, runner.return_value)
+
+    def _sub_memoized(self, op, path, template):
+        instruction, leaves, return_value = template.instantiate()
+        if not instruction.is_leaf():
+            yield from leaves
+        yield from self._sub_result(op, path, instruction, return_value)
+
+    def _sub_result(self, op, path, instruction, return_value):
+        """Add the instruction and return value of a finished subscriic."""
+        if self._retain or self.instruction.is_leaf():
+            self.instruction.append_child(instruction)
+        if instruction.is_leaf():
+            # The subscriic was empty, so its title is a leaf
+            yield instruction
+
+        if op.assign_to is not None:
+            if return_value is not None:
                 # Add return value into a variable
-                self._set_variable(step.assign_to, runner.return_value)
+                self._set_variable(op.assign_to, return_value)
             else:
                 raise ScriicRuntimeException(
                     self.file_path,
-                    "Expecting a return value from {path}, but one was not given",
+                    f"Expecting a return value from {path}, but one was not given",
                 )
 
-    def _return(self, step):
-        self.return_value = substitute_variables(
-            step.value, self.variables, self.file_path
+    def _return(self, op):
+        self.return_value = op.value.substitute(
+            self.frame, self.quoted, self.file_path
         )
+        return ()
 
-    def _repeat(self, step):
-        if isinstance(step.times, int):
+    def _repeat(self, op):
+        if isinstance(op.times, int):
             # Literal number
-            times = Value(step.times)
+            times = Value(op.times)
         else:
             # Variable name
-            try:
-                times = self.variables[step.times]
-            except KeyError:
+            times = self.frame[op.slot]
+            if times is None:
                 raise ScriicRuntimeException(
-                    self.file_path, "Variable {step.times} does not exist"
+                    self.file_path, f"Variable {op.times} does not exist"
                 )
 
             if len(times) > 1:
@@ -165,7 +408,7 @@ class FileRunner:
         if times.is_unknown():
             # We cannot just repeat the instructions because we do not know
             # an exact amount of times
-            self._repeat_unknown(step, times[0])
+            return self._repeat_unknown(op, times[0])
         else:
             try:
                 times = int(times[0])
@@ -175,68 +418,131 @@ class FileRunner:
                     f"Cannot parse {times} as a number of times to REPEAT",
                 )
             else:
-                self._repeat_known(step, times)
+                return self._repeat_known(op, times)
 
-    def _repeat_known(self, step, times):
+    def _repeat_known(self, op, times):
         """REPEAT for a known number of times."""
+        if op.lazy and self._lazy and times > 1:
+            yield from self._loop_lazy(op, range(times))
+            return
+
+        plan = op.plan
         for i in range(times):
-            for block_step in step.steps:
-                self._run_step(block_step)
+            for handler, block_op in plan:
+                yield from handler(self, block_op)
 
-    def _repeat_unknown(self, step, times):
+    def _repeat_unknown(self, op, times):
         """REPEAT for an UnknownValue of times."""
-        # This index will be the first instruction added inside the loop
-        return_to_index = len(self.instruction.children)
-
-        for block_step in step.steps:
-            self._run_step(block_step)
+        # The first leaf inside the loop has the same display index as the
+        # first instruction added by the loop
+        return_to = None
+        for leaf in self._run_block(op.plan):
+            if return_to is None:
+                return_to = leaf
+            yield leaf
 
         # Add a step telling the user to go back to the start of the loop
-        self.instruction.add_child(
+        yield self._add_child(
             Value(
                 "Go to ",
-                self.instruction.children[return_to_index],
+                return_to,
                 " and repeat the number of times from ",
                 times.instruction,
             )
         )
 
-    def _letters(self, step):
-        substitution = substitute_variables(step.text, self.variables, self.file_path)
+    def _letters(self, op):
+        substitution = op.text.substitute(self.frame, self.quoted, self.file_path)
 
         if substitution.is_unknown():
             # We don't know the exact value of the string
             # Ask the user to jump back and repeat for each letter
-            self._letters_unknown(step, substitution)
+            return self._letters_unknown(op, substitution)
         else:
             # We know the exact value of the string
             # Repeat the instructions directly
-            self._letters_known(step, str(substitution))
+            return self._letters_known(op, str(substitution))
 
-    def _letters_known(self, step, string):
+    def _letters_known(self, op, string):
         """LETTERS for a string we know the exact value of."""
+        if op.lazy and self._lazy and len(string) > 1:
+            yield from self._loop_lazy(op, string)
+            return
+
+        plan = op.plan
+        assign_to = op.assign_to
+        frame = self.frame
+        quoted = self.quoted
+
         for letter in string:
-            for block_step in step.steps:
-                if step.assign_to is not None:
-                    self.variables[step.assign_to] = letter
-                self._run_step(block_step)
+            value = Value(letter)
+            quoted_value = quoted_parts(value)
+            for handler, block_op in plan:
+                if assign_to is not None:
+                    frame[assign_to] = value
+                    quoted[assign_to] = quoted_value
+                yield from handler(self, block_op)
+
+    def _loop_lazy(self, op, values):
+        """
+        Run the first iteration of a self-contained loop, and add a
+        RepeatedInstruction which runs the others when they are accessed.
+
+        :param values: Sequence of the letter for each iteration of
+            ``LETTERS``, or of anything for ``REPEAT``.
+        """
+        # Later steps may change variables from outside the loop
+        frame = list(self.frame)
+        quoted = list(self.quoted)
+
+        def generate(i):
+            return self._iteration(op, values[i], frame, quoted)
+
+        first = generate(0)
+        if first.is_leaf():
+            # Nothing is generated by any iteration
+            return
+
+        self.instruction.append_child(RepeatedInstruction(len(values), generate, first))
+        yield from first.leaf_nodes()
+
+    def _iteration(self, op, letter, frame, quoted):
+        """Run one iteration of a loop and return an instruction containing it."""
+        runner = copy.copy(self)
+        runner.frame = list(frame)
+        runner.quoted = list(quoted)
+        runner.instruction = Instruction(Value())
+
+        if type(op) == LettersOp and op.assign_to is not None:
+            value = Value(letter)
+            quoted_value = quoted_parts(value)
+            for handler, block_op in op.plan:
+                runner.frame[op.assign_to] = value
+                runner.quoted[op.assign_to] = quoted_value
+                for leaf in handler(runner, block_op):
+                    pass
+        else:
+            for leaf in runner._run_block(op.plan):
+                pass
+
+        return runner.instruction
 
-    def _letters_unknown(self, step, string):
+    def _letters_unknown(self, op, string):
         """LETTERS for an unknown string."""
-        return_to = self.instruction.add_child(
+        return_to = self._add_child(
             Value(
                 "Get the first letter of ",
                 string,
                 ", or the next letter if you are returning from a future instruction",
             )
         )
-        if step.assign_to is not None:
-            self._set_variable(step.assign_to, UnknownValue(return_to))
+        yield return_to
+        if op.assign_to is not None:
+            self._set_variable(op.assign_to, UnknownValue(return_to))
 
-        for block_step in step.steps:
-            self._run_step(block_step)
+        yield from self._run_block(op.plan)
 
-        self.instruction.add_child(
+        yield self._add_child(
             Value(
                 "If you haven't yet reached the last letter of ",
                 string,
@@ -0,0 +1,223 @@
+"""
+HTTP server which runs Scriic files on request.
+
+Files are run by a pool of worker processes, each of which keeps the programs
+it has parsed in :data:`scriic.cache.program_cache`, so only the first request
+for each file pays for parsing it.
+
+Endpoints:
+
+``POST /run``
+    Run a file. The body is a JSON object with the ``script`` to run, relative
+    to the served directory, and a ``parameters`` object. The response has the
+    ``title`` and a list of ``steps``, where step ``n`` is at index ``n - 1``,
+    or an ``error``.
+
+``GET /metrics``
+    Request latency and program cache statistics.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from scriic.cache import program_cache
+from scriic.errors import ScriicException
+from scriic.run import FileRunner
+
+# Number of recent requests which latency percentiles are calculated from
+LATENCY_SAMPLES = 1000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def _run_script(file_path, parameters):
+    """
+    Run a file in a worker process.
+
+    :returns: Tuple of the response, and the worker's process ID and cache
+        statistics.
+    """
+    try:
+        runner = FileRunner(file_path)
+        instruction = runner.run(dict(parameters))
+    except ScriicException as e:
+        result = {"error": str(e)}
+    else:
+        instruction.number()
+        result = {
+            "title": instruction.text(),
+            "steps": [leaf.text() for leaf in instruction.leaf_nodes()],
+        }
+
+    stats = (program_cache.hits, program_cache.misses, len(program_cache))
+    return result, os.getpid(), stats
+
+
+class Server:
+    """
+    Server for the Scriic files in a directory.
+
+    :param root: Directory which script names are relative to.
+    :param workers: Number of worker processes, defaulting to the number of
+        CPUs.
+    """
+
+    def __init__(self, root, workers=None):
+        self.root = os.path.realpath(root)
+        self.executor = ProcessPoolExecutor(workers)
+
+        self.requests = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        # Latest cache statistics from each worker, keyed by process ID
+        self.cache_stats = dict()
+
+    def resolve(self, script):
+        """Return the path of a script, or ``None`` if it is not served."""
+        path = os.path.realpath(os.path.join(self.root, script))
+        if os.path.commonpath([self.root, path]) != self.root:
+            return None
+        if not os.path.isfile(path):
+            return None
+        return path
+
+    async def run(self, body):
+        """Handle a request to ``/run``, returning a status and response."""
+        try:
+            request = json.loads(body)
+            script = request["script"]
+            parameters = {
+                name: str(value)
+                for name, value in request.get("parameters", {}).items()
+            }
+        except (ValueError, TypeError, KeyError, AttributeError):
+            return 400, {"error": "Expected a JSON object with a script"}
+
+        path = self.resolve(script)
+        if path is None:
+            return 404, {"error": f"No such script: {script}"}
+
+        loop = asyncio.get_event_loop()
+        result, pid, stats = await loop.run_in_executor(
+            self.executor, _run_script, path, parameters
+        )
+        self.cache_stats[pid] = stats
+
+        if "error" in result:
+            return 400, result
+        return 200, result
+
+    def metrics(self):
+        """Return the statistics served by ``/metrics``."""
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+        hits = sum(stats[0] for stats in self.cache_stats.values())
+        misses = sum(stats[1] for stats in self.cache_stats.values())
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": {
+                "samples": len(latencies),
+                "mean": sum(latencies) / len(latencies) if latencies else None,
+                "p50": percentile(0.5),
+                "p90": percentile(0.9),
+                "p99": percentile(0.99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "cache": {
+                "workers": len(self.cache_stats),
+                "hits": hits,
+                "misses": misses,
+                "programs": sum(stats[2] for stats in self.cache_stats.values()),
+            },
+        }
+
+    async def dispatch(self, method, target, body):
+        """Return the status and response for a request."""
+        if target == "/run":
+            if method != "POST":
+                return 405, {"error": "Use POST"}
+
+            start = time.perf_counter()
+            status, response = await self.run(body)
+            self.requests += 1
+            if status != 200:
+                self.errors += 1
+            self.latencies.append((time.perf_counter() - start) * 1000)
+            return status, response
+
+        elif target == "/metrics":
+            return 200, self.metrics()
+
+        return 404, {"error": f"Not found: {target}"}
+
+    async def handle(self, reader, writer):
+        """Serve requests on one connection until it is closed."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "Bad request"}, False)
+                    break
+
+                headers = dict()
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length)
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                status, response = await self.dispatch(method, target, body)
+                await self.respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, response, keep_alive):
+        body = json.dumps(response).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host="127.0.0.1", port=8000):
+        """
+        Start listening for connections.
+
+        :returns: The :class:`asyncio.Server`.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self):
+        """Shut down the worker processes."""
+        self.executor.shutdown()
@@ -1,4 +1,5 @@
 import re
+import sys
 
 from .errors import ScriicRuntimeException
 from .value import UnknownValue, Value
@@ -20,7 +21,7 @@ def substitute_variables(parts, variables, file_path=None):
     :returns: Value instance with substitutions made.
     :raises ScriicRuntimeException: An invalid variable is referenced in the string.
     """
-    value = Value()
+    value = list()
 
     for part in parts:
         if isinstance(part, str):
@@ -50,4 +51,85 @@ def substitute_variables(parts, variables, file_path=None):
         if quoted:
             value.append('"')
 
-    return value
+    return Value.from_parts(value)
+
+
+def quoted_parts(value):
+    """
+    Return the parts to substitute for a Value when it is quoted.
+
+    Unknown values are never quoted.
+    """
+    if value.is_unknown():
+        return value
+    return ('"',) + value + ('"',)
+
+
+class Template:
+    """
+    Parts of some text, compiled once so they can be substituted many times.
+
+    The text is split into pieces, each of which is a tuple of literal parts
+    followed by a variable. Variables are compiled to the index of their slot,
+    so substitution concatenates tuples taken from lists of values rather than
+    looking up names. Text which does not reference any variables is converted
+    to a Value in advance, and that same Value is returned by every
+    substitution.
+
+    :param parts: List of parts, as accepted by :func:`substitute_variables`.
+    :param slots: Dictionary of variable names and slot indexes.
+    """
+
+    __slots__ = ("pieces", "tail", "names", "constant")
+
+    def __init__(self, parts, slots):
+        pieces = list()
+        names = list()
+        literal = list()
+        for part in parts:
+            if isinstance(part, str):
+                # Share literal text between every file which uses it
+                literal.append(sys.intern(part))
+            else:
+                pieces.append((tuple(literal), part.quoted, slots[part.name]))
+                names.append(part.name)
+                literal = list()
+
+        self.pieces = tuple(pieces)
+        self.tail = tuple(literal)
+        self.names = tuple(names)
+
+        if self.pieces:
+            self.constant = None
+        else:
+            self.constant = Value.from_parts(self.tail)
+
+    def substitute(self, frame, quoted, file_path=None):
+        """
+        Substitute variable values into this template and return a Value.
+
+        :param frame: List of variable Values, or ``None`` for variables which
+            have not been set, indexed by slot.
+        :param quoted: List of the parts to substitute for each variable when
+            it is quoted, as returned by :func:`quoted_parts`.
+        :param file_path: Path to the current program, only used if a runtime
+            exception needs to be raised.
+        :raises ScriicRuntimeException: An unset variable is referenced.
+        """
+        if self.constant is not None:
+            return self.constant
+
+        parts = ()
+        try:
+            for literal, is_quoted, slot in self.pieces:
+                parts += literal
+                parts += quoted[slot] if is_quoted else frame[slot]
+        except TypeError:
+            for (_, _, slot), name in zip(self.pieces, self.names):
+                if frame[slot] is None:
+                    raise ScriicRuntimeException(
+                        file_path, f"Variable {name} does not exist"
+                    )
+            raise
+
+        return Value.from_parts(parts + self.tail)
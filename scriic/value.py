@@ -5,6 +5,8 @@ class UnknownValue:
     :param instruction: The instruction this value has originated from.
     """
 
+    __slots__ = ("instruction",)
+
     def __init__(self, instruction):
         self.instruction = instruction
 
@@ -12,15 +14,38 @@ class UnknownValue:
         return f"the result of {self.instruction}"
 
 
-class Value(list):
-    def __init__(self, *parts):
-        """
-        The value of a variable or instruction text.
+class Value(tuple):
+    """
+    The value of a variable or instruction text.
 
-        :param parts: Things which are concatenated to get this value.
-        """
-        super().__init__()
-        self.extend(parts)
+    Values are immutable, so the same instance can safely be shared between
+    many variables and instructions. They compare equal to lists of the same
+    parts.
+
+    :param parts: Things which are concatenated to get this value.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *parts):
+        return tuple.__new__(cls, parts)
+
+    @classmethod
+    def from_parts(cls, parts):
+        """Create a Value from an iterable of parts."""
+        return tuple.__new__(cls, parts)
+
+    def __eq__(self, other):
+        if isinstance(other, list):
+            return len(self) == len(other) and all(
+                a == b for a, b in zip(self, other)
+            )
+        return tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = tuple.__hash__
 
     def __repr__(self):
         """
@@ -31,6 +56,11 @@ class Value(list):
         """
         return "".join([str(p) for p in self])
 
+    __str__ = __repr__
+
     def is_unknown(self):
         """Return whether this value contains any UnknownValues."""
-        return any([type(p) == UnknownValue for p in self])
+        for p in self:
+            if type(p) == UnknownValue:
+                return True
+        return False
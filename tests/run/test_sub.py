@@ -219,3 +219,18 @@ def test_sub_nonexistant_file(tmp_path):
     runner = FileRunner(tmp_file.absolute())
     with pytest.raises(FileNotFoundError):
         runner.run()
+
+
+def test_sub_missing_module_not_reached(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 0
+            SUB nonexistant_module:test.scriic
+        END
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    assert len(runner.run().children) == 0
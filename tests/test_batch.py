@@ -0,0 +1,49 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from scriic.batch import read_parameter_sets, run_batch
+from scriic.errors import ScriicSyntaxException
+from scriic.run import FileRunner
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+
+
+def expected_steps(file_path, parameters):
+    instruction = FileRunner(file_path).run(dict(parameters))
+    steps = list()
+    for i, leaf in enumerate(instruction.leaf_nodes()):
+        leaf.display_index = i + 1
+        steps.append(leaf.text())
+    return steps
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_results_in_order(workers):
+    file_path = scriicsics_dir / "say.scriic"
+    parameter_sets = [{"text": f"phrase {i}", "language": "English"} for i in range(20)]
+
+    results = list(run_batch(file_path, parameter_sets, workers, chunksize=3))
+    assert results == [
+        {"steps": expected_steps(file_path, parameters)}
+        for parameters in parameter_sets
+    ]
+
+
+def test_error():
+    results = list(run_batch(scriicsics_dir / "say.scriic", [{}], workers=1))
+    assert "Missing one or more parameters" in results[0]["error"]
+
+
+def test_syntax_error(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text("This is not a scriic")
+
+    with pytest.raises(ScriicSyntaxException):
+        list(run_batch(tmp_file, [{}]))
+
+
+def test_read_parameter_sets():
+    lines = [json.dumps({"a": "b", "c": 1}), "", json.dumps({})]
+    assert list(read_parameter_sets(lines)) == [{"a": "b", "c": "1"}, {}]
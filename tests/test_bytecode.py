@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from scriic import bytecode
+from scriic.errors import ScriicSyntaxException
+from scriic.parser import parse
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+scriicsics = scriicsics_dir.glob("**/*.scriic")
+
+
+@pytest.mark.parametrize("file_path", scriicsics)
+def test_round_trip(file_path):
+    text = file_path.read_text()
+    digest = bytecode.source_hash(text)
+    program = parse(text)
+
+    assert bytecode.loads(bytecode.dumps(program, digest), digest) == program
+
+
+def test_stale_digest():
+    program = parse("HOWTO Test scriic")
+    data = bytecode.dumps(program, bytecode.source_hash("HOWTO Test scriic"))
+
+    assert bytecode.loads(data, bytecode.source_hash("HOWTO Other")) is None
+
+
+def test_corrupt_data():
+    digest = bytecode.source_hash("HOWTO Test scriic")
+    data = bytecode.dumps(parse("HOWTO Test scriic"), digest)
+
+    assert bytecode.loads(data[:-3], digest) is None
+    assert bytecode.loads(b"SCRC", digest) is None
+
+
+def test_load_program_uses_cache(tmp_path, monkeypatch):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test <param>
+        DO Something with [param]
+        """
+    )
+
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    program = bytecode.load_program(tmp_file)
+    assert Path(bytecode.cache_path(tmp_file)).exists()
+
+    def fail(text, file_path):
+        raise AssertionError("The file should not be parsed again")
+
+    monkeypatch.setattr(bytecode, "_parse", fail)
+    assert bytecode.load_program(tmp_file) == program
+
+
+def test_load_program_reparses_changed_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text("HOWTO Test scriic")
+    bytecode.load_program(tmp_file)
+
+    tmp_file.write_text("HOWTO Test changed scriic")
+    title, _ = bytecode.load_program(tmp_file)
+    assert title == ["Test changed scriic"]
+
+
+def test_compile_all(tmp_path):
+    (tmp_path / "good.scriic").write_text("HOWTO Test scriic")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "bad.scriic").write_text("DO Something")
+
+    results = dict(bytecode.compile_all(tmp_path))
+
+    assert results[str(tmp_path / "good.scriic")] is None
+    assert isinstance(
+        results[str(tmp_path / "nested" / "bad.scriic")], ScriicSyntaxException
+    )
+    assert Path(bytecode.cache_path(tmp_path / "good.scriic")).exists()
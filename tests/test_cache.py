@@ -0,0 +1,85 @@
+import os
+
+import pytest
+
+from scriic.cache import ProgramCache, program_cache
+from scriic.errors import ScriicSyntaxException
+from scriic.run import FileRunner
+
+
+def test_cache_hit(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text("HOWTO Test scriic")
+
+    cache = ProgramCache()
+    first = cache.load(tmp_file)
+    second = cache.load(tmp_file)
+
+    assert first is second
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_invalidated_on_change(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text("HOWTO Test scriic")
+
+    cache = ProgramCache()
+    title, _ = cache.load(tmp_file)
+    assert title == ["Test scriic"]
+
+    tmp_file.write_text("HOWTO Test changed scriic")
+    stat = tmp_file.stat()
+    os.utime(tmp_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+    title, _ = cache.load(tmp_file)
+    assert title == ["Test changed scriic"]
+    assert cache.misses == 2
+
+
+def test_cache_eviction(tmp_path):
+    cache = ProgramCache(maxsize=2)
+    for name in "abc":
+        tmp_file = tmp_path / f"{name}.scriic"
+        tmp_file.write_text(f"HOWTO Test {name}")
+        cache.load(tmp_file)
+
+    assert len(cache) == 2
+    cache.load(tmp_path / "a.scriic")
+    assert cache.misses == 4
+
+
+def test_cache_syntax_error(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text("DO Something")
+
+    cache = ProgramCache()
+    with pytest.raises(ScriicSyntaxException):
+        cache.load(tmp_file)
+    assert len(cache) == 0
+
+
+def test_sub_loads_each_file_once(tmp_path):
+    tmp_file_1 = tmp_path / "test1.scriic"
+    tmp_file_1.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 10
+            SUB ./test2.scriic
+        END
+        """
+    )
+
+    tmp_file_2 = tmp_path / "test2.scriic"
+    tmp_file_2.write_text(
+        """
+        HOWTO Test subscriic
+        DO This is in file 2
+        """
+    )
+
+    program_cache.clear()
+    FileRunner(tmp_file_1.absolute()).run()
+
+    assert program_cache.misses == 2
+    assert program_cache.hits == 0
@@ -1,7 +1,10 @@
+import sys
+
 import pytest
 
 from scriic.errors import UnsetDisplayIndexException
 from scriic.instruction import Instruction
+from scriic.value import Value
 
 
 def test_instruction_leaves():
@@ -29,3 +32,122 @@ def test_raises_unset_display_index():
     instruction = Instruction("I don't have a display index")
     with pytest.raises(UnsetDisplayIndexException):
         str(instruction)
+
+
+def test_compact():
+    instruction = Instruction("1")
+    assert not hasattr(instruction, "__dict__")
+    assert instruction.is_leaf()
+
+    child = instruction.add_child("2")
+    assert not instruction.is_leaf()
+    assert instruction.children == [child]
+
+
+def build_tree():
+    root = Instruction("root")
+    a = root.add_child("a")
+    a.add_child("a1")
+    a.add_child("a2")
+    root.add_child("b")
+    return root
+
+
+def test_pre_order():
+    assert [x.text() for x in build_tree().pre_order()] == [
+        "root",
+        "a",
+        "a1",
+        "a2",
+        "b",
+    ]
+
+
+def test_post_order():
+    assert [x.text() for x in build_tree().post_order()] == [
+        "a1",
+        "a2",
+        "a",
+        "b",
+        "root",
+    ]
+
+
+def test_first_leaf_follows_new_children():
+    root = Instruction("root")
+    a = root.add_child("a")
+    assert root.first_leaf() is a
+
+    a1 = a.add_child("a1")
+    a1.display_index = 1
+    assert root.first_leaf() is a1
+    assert str(root) == "instruction 1"
+
+
+def test_deeper_than_recursion_limit():
+    depth = sys.getrecursionlimit() * 2
+    root = Instruction("root")
+    node = root
+    for i in range(depth):
+        node = node.add_child(str(i))
+    node.display_index = 1
+    root.add_child("last")
+
+    assert [x.text() for x in root.leaf_nodes()] == [str(depth - 1), "last"]
+    assert sum(1 for _ in root.pre_order()) == depth + 2
+    assert next(root.post_order()) is node
+    assert str(root) == "instruction 1"
+
+
+def test_freeze(monkeypatch):
+    root = Instruction("root")
+    first = root.add_child("First")
+    second = root.add_child(Value("Use ", first))
+    first.display_index = 1
+    second.display_index = 2
+    root.freeze()
+
+    calls = list()
+    get_display_index = Instruction.get_display_index
+
+    def counting(self):
+        calls.append(self)
+        return get_display_index(self)
+
+    monkeypatch.setattr(Instruction, "get_display_index", counting)
+
+    assert second.text() == "Use instruction 1"
+    assert second.text() == "Use instruction 1"
+    assert calls == []
+
+    # Renumbering invalidates the frozen text
+    first.display_index = 5
+    assert second.text() == "Use instruction 5"
+    assert calls == [first]
+
+
+def test_leaf_at():
+    root = build_tree()
+    leaves = list(root.leaf_nodes())
+
+    assert root.leaf_count() == 3
+    assert [root.leaf_at(i) for i in range(3)] == leaves
+    assert root.leaf_at(-1) is leaves[-1]
+    with pytest.raises(IndexError):
+        root.leaf_at(3)
+
+
+def test_leaves():
+    root = build_tree()
+    leaves = list(root.leaf_nodes())
+
+    for start in range(4):
+        for stop in range(5):
+            assert list(root.leaves(start, stop)) == leaves[start:stop]
+    assert list(root.leaves(1)) == leaves[1:]
+
+
+def test_number():
+    root = build_tree()
+    assert root.number() == 4
+    assert [x.display_index for x in root.leaf_nodes()] == [1, 2, 3]
@@ -0,0 +1,175 @@
+from pathlib import Path
+
+import pytest
+
+from scriic.cache import program_cache
+from scriic.instruction import RepeatedInstruction
+from scriic.run import FileRunner
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+
+
+def texts(instruction):
+    result = list()
+    for i, leaf in enumerate(instruction.leaf_nodes()):
+        leaf.display_index = i + 1
+        result.append(leaf.text())
+    return result
+
+
+def repeated(instruction):
+    return [x for x in instruction.children if isinstance(x, RepeatedInstruction)]
+
+
+def test_type():
+    runner = FileRunner(scriicsics_dir / "type.scriic")
+    parameters = {"text": "Hello", "keyboard": "the keyboard"}
+
+    lazy = runner.run(dict(parameters), lazy=True)
+    (node,) = repeated(lazy)
+    assert lazy.leaf_count() == 5 * node.leaves_per_iteration
+    assert texts(lazy) == texts(runner.run(dict(parameters)))
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        # Refers back to an earlier step of the same iteration
+        """
+        x{n} = DO Get something
+        DO Use [x{n}] with [outer]
+        """,
+        # Nested loops, including an unknown one
+        """
+        y{n} = DO Get a number
+        REPEAT y{n}
+            z{n} = DO Get something
+            REPEAT 2
+                DO Use [z{n}]
+            END
+        END
+        """,
+        # Subscriic with a parameter from the same iteration
+        """
+        x{n} = DO Get something
+        SUB ./sub.scriic
+        PRM param = [x{n}]
+        GO
+        """,
+    ],
+)
+def test_same_as_unrolled(tmp_path, body):
+    (tmp_path / "sub.scriic").write_text(
+        """
+        HOWTO Sub with <param>
+        DO Look at [param]
+        """
+    )
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        f"""
+        HOWTO Test scriic
+        outer = DO Get an outer value
+        REPEAT 3
+        {body.format(n=1)}
+        END
+        c = LETTERS abc
+        {body.format(n=2)}
+        DO Say [c"]
+        END
+        DO Finish with [outer]
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    lazy = runner.run(lazy=True)
+    assert repeated(lazy)
+    assert lazy.leaf_count() == len(texts(runner.run()))
+    assert texts(lazy) == texts(runner.run())
+
+
+def test_not_self_contained(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        x = DO Get something
+        REPEAT 3
+            DO Use [x]
+            x = DO Get something else
+        END
+        c = LETTERS 123
+            REPEAT c
+                DO Something
+            END
+        END
+        """
+    )
+
+    program = program_cache.load(tmp_file.absolute())
+    _, repeat, letters = program.steps
+    assert not program.is_self_contained(repeat)
+    assert not program.is_self_contained(letters)
+    # The inner loop does not depend on the others
+    assert program.is_self_contained(letters.steps[0])
+
+
+def test_iterations_generated_when_accessed(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 1000000
+            x = DO Get something
+            DO Use [x]
+        END
+        """
+    )
+
+    instruction = FileRunner(tmp_file.absolute()).run(lazy=True)
+    (node,) = repeated(instruction)
+    assert instruction.leaf_count() == 2000000
+    assert len(node._children.generated) == 1
+
+    leaves = instruction.leaf_nodes()
+    for i in range(3):
+        next(leaves).display_index = i + 1
+    assert next(leaves).text() == "Use the result of instruction 3"
+    assert len(node._children.generated) == 2
+
+
+def test_random_access(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        outer = DO Get something
+        REPEAT 1000000
+            x = DO Look at [outer]
+            DO Use [x]
+        END
+        DO Finish
+        """
+    )
+
+    instruction = FileRunner(tmp_file.absolute()).run(lazy=True)
+    instruction.number()
+    (node,) = repeated(instruction)
+
+    assert [x.text() for x in instruction.leaves(1999999, 2000002)] == [
+        "Look at the result of instruction 1",
+        "Use the result of instruction 2000000",
+        "Finish",
+    ]
+    assert instruction.leaf_at(4).text() == "Use the result of instruction 4"
+    assert sorted(node._children.generated) == [0, 1, 999999]
+
+
+def test_leaves_same_as_unrolled():
+    runner = FileRunner(scriicsics_dir / "type.scriic")
+    parameters = {"text": "Hello", "keyboard": "the keyboard"}
+    expected = texts(runner.run(dict(parameters)))
+
+    instruction = runner.run(dict(parameters), lazy=True)
+    instruction.number()
+    assert [x.text() for x in instruction.leaves(30, 70)] == expected[30:70]
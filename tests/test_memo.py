@@ -0,0 +1,97 @@
+from scriic.instruction import Instruction
+from scriic.memo import SubTemplate, memo_key
+from scriic.run import FileRunner
+from scriic.value import UnknownValue, Value
+
+
+def write_files(tmp_path):
+    tmp_file_1 = tmp_path / "test1.scriic"
+    tmp_file_1.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 3
+            val = SUB ./test2.scriic
+            PRM param = ABC
+            GO
+            DO Got [val]
+        END
+        """
+    )
+
+    tmp_file_2 = tmp_path / "test2.scriic"
+    tmp_file_2.write_text(
+        """
+        HOWTO Test subscriic with <param>
+        var = DO Observe [param]
+        DO Read [var]
+        RETURN [var]
+        """
+    )
+
+    return tmp_file_1
+
+
+def test_memo_key():
+    assert memo_key("a", {"x": Value("1"), "y": Value("2")}) == memo_key(
+        "a", {"y": Value("2"), "x": Value("1")}
+    )
+    assert memo_key("a", {"x": Value("1")}) != memo_key("a", {"x": Value("2")})
+    assert memo_key("a", {"x": Value(UnknownValue(Instruction("1")))}) is None
+
+
+def test_display_index_per_call(tmp_path):
+    runner = FileRunner(write_files(tmp_path).absolute())
+    instruction = runner.run()
+
+    # Number everything before rendering anything
+    leaves = list(instruction.leaf_nodes())
+    for i, leaf in enumerate(leaves):
+        leaf.display_index = i + 1
+
+    assert [leaf.text() for leaf in leaves] == [
+        "Observe ABC",
+        "Read the result of instruction 1",
+        "Got the result of instruction 1",
+    ] + [
+        "Observe ABC",
+        "Read the result of instruction 4",
+        "Got the result of instruction 4",
+    ] + [
+        "Observe ABC",
+        "Read the result of instruction 7",
+        "Got the result of instruction 7",
+    ]
+    assert len({id(leaf) for leaf in leaves}) == len(leaves)
+
+
+def test_streaming(tmp_path):
+    runner = FileRunner(write_files(tmp_path).absolute())
+
+    texts = [leaf.text() for leaf in runner.iter_steps()]
+    assert texts[-3:] == [
+        "Observe ABC",
+        "Read the result of instruction 7",
+        "Got the result of instruction 7",
+    ]
+
+
+def test_template_references():
+    root = Instruction("Root")
+    observe = root.add_child("Observe")
+    root.add_child(Value("Use ", UnknownValue(observe)))
+
+    template = SubTemplate.record(root, Value(UnknownValue(observe)))
+    clone, leaves, return_value = template.instantiate()
+
+    assert clone is not root
+    assert leaves == clone.children
+    assert leaves[1].text_value[1].instruction is leaves[0]
+    assert return_value[0].instruction is leaves[0]
+
+
+def test_template_outside_reference():
+    outside = Instruction("Outside")
+    root = Instruction("Root")
+    root.add_child(Value("Use ", UnknownValue(outside)))
+
+    assert SubTemplate.record(root, None) is None
@@ -0,0 +1,109 @@
+import random
+from pathlib import Path
+
+import pytest
+from parsy import ParseError
+
+from scriic.parser import parse
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+scriicsics = scriicsics_dir.glob("**/*.scriic")
+
+# Lines which are awkward for a parser which does not backtrack
+LINES = [
+    "DO x [a] y",
+    'DO [a"]',
+    "DO ",
+    "DO  ",
+    "DO [",
+    "DO a [b c]",
+    "x = DO y",
+    "RETURN = DO x",
+    "RETURN = LETTERS x",
+    "REPEAT = LETTERS x",
+    "DO = SUB ./a",
+    "DO = x",
+    "PRM = DO x",
+    "SUB ./a",
+    "SUB module:./a",
+    "SUB module:",
+    "SUB  ./a",
+    "SUB ./a x",
+    "y = SUB ./b",
+    "PRM p = v",
+    "PRM p = [q]",
+    "PRM p v",
+    "PRM p = ",
+    "GO",
+    "GOX",
+    "REPEAT 5",
+    "REPEAT n",
+    "REPEAT 5x",
+    "REPEAT",
+    "c = LETTERS [t]",
+    "LETTERS abc",
+    "END",
+    "ENDX",
+    "END x",
+    "END = DO x",
+    "RETURN v",
+    "x = RETURN v",
+    "",
+    "   ",
+    "\x85",
+    " \r",
+    "DO a\x85DO b",
+    "  DO indented  ",
+]
+
+
+def parse_both(text):
+    """Parse with both parsers, returning results or error messages."""
+    results = []
+    for combinators in (False, True):
+        try:
+            results.append(parse(text, combinators=combinators))
+        except ParseError as e:
+            results.append(str(e))
+    return results
+
+
+@pytest.mark.parametrize("file_path", scriicsics)
+def test_scriicsics(file_path):
+    fast, combinators = parse_both(file_path.read_text())
+    assert fast == combinators
+
+
+@pytest.mark.parametrize("line", LINES)
+def test_single_line(line):
+    fast, combinators = parse_both(f"HOWTO Test <param>\n{line}\n")
+    assert fast == combinators
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_random_programs(seed):
+    rng = random.Random(seed)
+
+    for _ in range(50):
+        lines = [rng.choice(["HOWTO Test", "  HOWTO <a> and <b\">  ", "DO x"])]
+        lines.extend(rng.choice(LINES) for _ in range(rng.randint(0, 12)))
+        text = rng.choice(["\n", "\n\n", "\n  "]).join(lines)
+
+        fast, combinators = parse_both(text)
+        assert fast == combinators, text
+
+
+def test_nested_blocks():
+    depth = 2000
+    text = (
+        "HOWTO Test\n"
+        + "REPEAT 2\n" * depth
+        + "DO Something\n"
+        + "END\n" * depth
+    )
+
+    title, steps = parse(text)
+    for _ in range(depth):
+        (step,) = steps
+        steps = step.steps
+    assert steps[0].text == ["Something"]
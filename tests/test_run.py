@@ -44,3 +44,19 @@ def test_missing_end(tmp_path):
 
     with pytest.raises(ScriicSyntaxException):
         FileRunner(tmp_file.absolute())
+
+
+def test_plan_is_shared(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        DO Something
+        """
+    )
+
+    runner1 = FileRunner(tmp_file.absolute())
+    runner2 = FileRunner(tmp_file.absolute())
+
+    assert runner1.plan is runner2.plan
+    assert runner1.run().children[0].text() == "Something"
@@ -0,0 +1,77 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from scriic.serve import Server
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+
+
+async def request(port, method, target, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(
+        f"{method} {target} HTTP/1.1\r\nContent-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n".encode("latin-1") + data
+    )
+    response = await reader.read()
+    writer.close()
+
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+
+@pytest.fixture
+def serve():
+    server = Server(scriicsics_dir, workers=1)
+    loop = asyncio.new_event_loop()
+    listener = loop.run_until_complete(server.start(port=0))
+    port = listener.sockets[0].getsockname()[1]
+
+    def send(*args):
+        return loop.run_until_complete(request(port, *args))
+
+    yield server, send
+
+    listener.close()
+    loop.run_until_complete(listener.wait_closed())
+    loop.close()
+    server.close()
+
+
+def test_run(serve):
+    server, send = serve
+    status, response = send(
+        "POST", "/run", {"script": "look.scriic", "parameters": {"thing": "it"}}
+    )
+
+    assert status == 200
+    assert response["title"] == "Look at it"
+    assert response["steps"][2] == "Focus your eyes on it"
+
+
+def test_errors(serve):
+    server, send = serve
+
+    assert send("POST", "/run", {"script": "../setup.py"})[0] == 404
+    assert send("POST", "/run", ["not", "an", "object"])[0] == 400
+    assert send("GET", "/run")[0] == 405
+
+    status, response = send("POST", "/run", {"script": "look.scriic"})
+    assert status == 400
+    assert "Missing one or more parameters" in response["error"]
+
+
+def test_metrics(serve):
+    server, send = serve
+    for _ in range(3):
+        send("POST", "/run", {"script": "look.scriic", "parameters": {"thing": "it"}})
+
+    status, metrics = send("GET", "/metrics")
+    assert status == 200
+    assert metrics["requests"] == 3
+    assert metrics["errors"] == 0
+    assert metrics["latency_ms"]["samples"] == 3
+    assert metrics["cache"] == {"workers": 1, "hits": 2, "misses": 1, "programs": 1}
@@ -0,0 +1,82 @@
+from itertools import islice
+from pathlib import Path
+
+from scriic.run import FileRunner
+
+scriicsics_dir = Path(__file__).parent.parent / "scriicsics"
+
+
+def test_same_as_run():
+    runner = FileRunner(scriicsics_dir / "type.scriic")
+    parameters = {"text": "Hello", "keyboard": "the keyboard"}
+
+    expected = list()
+    for i, instruction in enumerate(runner.run(dict(parameters)).leaf_nodes()):
+        instruction.display_index = i + 1
+        expected.append(instruction.text())
+
+    streamed = [x.text() for x in runner.iter_steps(dict(parameters))]
+    assert streamed == expected
+
+
+def test_numbering(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        var = DO Get some value
+        DO Read [var]
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    steps = list(runner.iter_steps())
+
+    assert [x.display_index for x in steps] == [1, 2]
+    assert steps[1].text() == "Read the result of instruction 1"
+
+
+def test_title_only(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    (step,) = runner.iter_steps()
+    assert step.display_index == 1
+    assert step.text() == "Test scriic"
+
+
+def test_early_termination(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 1000000000
+            DO Something
+        END
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    steps = list(islice(runner.iter_steps(), 5))
+    assert [x.display_index for x in steps] == [1, 2, 3, 4, 5]
+
+
+def test_children_not_retained(tmp_path):
+    tmp_file = tmp_path / "test.scriic"
+    tmp_file.write_text(
+        """
+        HOWTO Test scriic
+        REPEAT 100
+            DO Something
+        END
+        """
+    )
+
+    runner = FileRunner(tmp_file.absolute())
+    assert len(list(runner.iter_steps())) == 100
+    assert len(runner.instruction.children) == 1
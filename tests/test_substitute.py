@@ -3,7 +3,8 @@ import pytest
 from scriic.errors import ScriicRuntimeException
 from scriic.parser.howto import Parameter
 from scriic.parser.primitives import Substitution
-from scriic.substitute import substitute_variables
+from scriic.substitute import Template, quoted_parts, substitute_variables
+from scriic.value import UnknownValue, Value
 
 
 @pytest.mark.parametrize("s_type", [Substitution, Parameter])
@@ -36,3 +37,46 @@ def test_no_quotation_marks_on_unknown(s_type):
 def test_invalid_variable(s_type):
     with pytest.raises(ScriicRuntimeException):
         substitute_variables([s_type("var", False)], {})
+
+
+def frame_of(*values):
+    return list(values), [None if v is None else quoted_parts(v) for v in values]
+
+
+def test_template():
+    template = Template(
+        ["A", Substitution("x", False), "B", Substitution("y", True), "C"],
+        {"x": 0, "y": 1},
+    )
+    frame, quoted = frame_of(Value("1"), Value("2", "3"))
+
+    assert template.substitute(frame, quoted) == [
+        "A",
+        "1",
+        "B",
+        '"',
+        "2",
+        "3",
+        '"',
+        "C",
+    ]
+
+
+def test_template_unknown_not_quoted():
+    from scriic.instruction import Instruction
+
+    unknown = Value(UnknownValue(Instruction("text")))
+    template = Template([Substitution("x", True)], {"x": 0})
+
+    assert template.substitute(*frame_of(unknown)) == list(unknown)
+
+
+def test_template_constant():
+    template = Template(["A", "B"], {})
+    assert template.substitute([], []) is template.substitute([], [])
+
+
+def test_template_unset_variable():
+    template = Template(["A", Substitution("x", False)], {"x": 0})
+    with pytest.raises(ScriicRuntimeException, match="Variable x does not exist"):
+        template.substitute(*frame_of(None))
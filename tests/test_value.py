@@ -0,0 +1,23 @@
+import pytest
+
+from scriic.instruction import Instruction
+from scriic.value import UnknownValue, Value
+
+
+def test_value_is_immutable():
+    value = Value("A", "B")
+    with pytest.raises(AttributeError):
+        value.append("C")
+    assert not hasattr(value, "__dict__")
+
+
+def test_value_equality():
+    assert Value("A", "B") == ["A", "B"]
+    assert Value("A", "B") == Value.from_parts(["A", "B"])
+    assert Value("A") != Value("B")
+    assert len({Value("A"), Value("A")}) == 1
+
+
+def test_is_unknown():
+    assert not Value("A").is_unknown()
+    assert Value("A", UnknownValue(Instruction("1"))).is_unknown()